@@ -1,4 +1,6 @@
+from grammar import Budget, PreparationReport
 from loader import parse_grammar
+from wordsource import scan_words, check_words, write_verdicts
 
 
 def main():
@@ -9,30 +11,40 @@ def main():
             break
         print("Input filename with test sequences")
         testname = input()
-        grammar_file = open(filename)
-        g = parse_grammar(grammar_file)
+        print("Input filename for verdicts or nothing to skip")
+        verdicts_name = input()
+        print("Input time limit of checking of every word in seconds or nothing for unlimited")
+        limit = input()
+        budget = Budget(seconds=float(limit)) if limit != "" else None
+        with open(filename) as grammar_file:
+            g = parse_grammar(grammar_file)
         print("Initial grammar.")
         print(g)
         print("Preparations.")
-        g = g.prepare_for_checking()
+        report = PreparationReport(trace_memory=False)
+        g = g.prepare_for_checking(report)
         print(g)
         passed = True
-        test_file = open(testname)
-        first = g.build_first()
-        mode: bool = None
-        for raw_line in test_file.readlines():
-            line = raw_line.replace('\n', '')
-            if line == "[true]":
-                mode = True
-                continue
-            elif line == "[false]":
-                mode = False
-                continue
-            if mode is None:
-                raise Exception("Test file must have verity declaration at its beginning")
-            if g.check_word(line, first) != mode:
-                passed = False
-                print(not mode, line)
+        first = g.build_first(report)
+        print(report)
+        results = check_words(g, first, scan_words(testname), budget)
+        verdicts_file = None
+        try:
+            if verdicts_name != "":
+                verdicts_file = open(verdicts_name, "w")
+                results = write_verdicts(results, verdicts_file)
+            for mode, line, verdict in results:
+                if verdict is None:
+                    passed = False
+                    print("unknown", line)
+                elif verdict != mode:
+                    passed = False
+                    print(not mode, line)
+        finally:
+            # Verdicts written before an error
+            # of the words file are kept.
+            if verdicts_file is not None:
+                verdicts_file.close()
         if passed:
             print("All cases passed")
 
@@ -1,6 +1,30 @@
 from .grammar import *
 from .prefix_tree import *
+from .report import *
+from .registry import *
+from .lalr import *
+from .codegen import *
+from .lookahead import *
+from .analysis import *
+from .generator import *
+from .batch import *
+from .budget import *
+from .search import *
+from .bytemode import *
+from .diagnostics import *
 
 __all__ = []
 __all__ += grammar.__all__
 __all__ += prefix_tree.__all__
+__all__ += report.__all__
+__all__ += registry.__all__
+__all__ += lalr.__all__
+__all__ += codegen.__all__
+__all__ += lookahead.__all__
+__all__ += analysis.__all__
+__all__ += generator.__all__
+__all__ += batch.__all__
+__all__ += budget.__all__
+__all__ += search.__all__
+__all__ += bytemode.__all__
+__all__ += diagnostics.__all__
@@ -0,0 +1,319 @@
+__all__ = ['HotSpot', 'Confirmation', 'find_hot_spots', 'adversarial_word', 'confirm_hot_spot',
+           'backtracking_gate']
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import math
+import grammar
+
+Context = Tuple[str, str]
+# Amount of the last measurements the growth exponent is fitted by.
+FIT_POINTS = 4
+
+
+class HotSpot(NamedTuple):
+    """
+    Non-terminal that can cause exponential backtracking.
+
+    nterm       -- the non-terminal;
+    kind        -- 'overlap' if alternatives share the next symbol,
+                   'ambiguous' if they share the next max_k symbols or
+                   more than one alternative vanishes,
+                   'nullable-tail' if alternatives end by vanishing symbols;
+    lookahead   -- input on which alternatives overlap('' for nullable tails);
+    derivations -- the alternatives;
+    recursive   -- can the non-terminal derive itself(then backtracking multiplies);
+    score       -- estimation of danger, bigger is worse.
+    """
+    nterm: 'grammar.NonTerminal'
+    kind: str
+    lookahead: str
+    derivations: Tuple['grammar.Derivation', ...]
+    recursive: bool
+    score: int
+
+
+class Confirmation(NamedTuple):
+    """
+    Measurements of checking adversarial words of the hot spot.
+
+    lengths  -- lengths of checked words;
+    timings  -- seconds of checking of every word;
+    steps    -- expansions of non-terminals of every word;
+    exponent -- estimated exponent of growth of steps by length;
+    confirmed -- is growth faster than allowed.
+    """
+    spot: HotSpot
+    lengths: Tuple[int, ...]
+    timings: Tuple[float, ...]
+    steps: Tuple[int, ...]
+    exponent: float
+    confirmed: bool
+
+
+def _shortest_words(g: 'grammar.Grammar') -> Dict['grammar.NonTerminal', str]:
+    """
+    Determines the shortest terminal word of every not dead non-terminal.
+    :param g: Grammar.
+    :return: dict
+    """
+    shortest: Dict[grammar.NonTerminal, str] = dict()
+    changes = True
+    while changes:
+        changes = False
+        for nterm, deriv in g:
+            word = _derive_shortest(deriv, shortest)
+            if word is not None and (nterm not in shortest or len(word) < len(shortest[nterm])):
+                shortest[nterm] = word
+                changes = True
+    return shortest
+
+
+def _derive_shortest(deriv: 'grammar.Derivation', shortest: Dict['grammar.NonTerminal', str]) -> Optional[str]:
+    """
+    Returns the shortest terminal word of the derivation.
+    :param deriv: Derivation.
+    :param shortest: the shortest words of non-terminals.
+    :return: str or None if some symbol is dead.
+    """
+    word = ''
+    for symb in deriv:
+        if type(symb) == grammar.NonTerminal:
+            if symb not in shortest:
+                return None
+            word += shortest[symb]
+        else:
+            word += symb
+    return word
+
+
+def _contexts(g: 'grammar.Grammar', root: 'grammar.NonTerminal',
+              shortest: Dict['grammar.NonTerminal', str]) -> Dict['grammar.NonTerminal', Context]:
+    """
+    Determines the shortest contexts of non-terminals derived from the root.
+
+    Context of B is pair (u, v) of terminal words with root -->+ uBv.
+
+    :param g: Grammar.
+    :param root: the root non-terminal.
+    :param shortest: the shortest words of non-terminals.
+    :return: dict
+    """
+    contexts: Dict[grammar.NonTerminal, Context] = dict()
+
+    def relax(outer: Context, deriv: grammar.Derivation) -> bool:
+        changed = False
+        for i, symb in enumerate(deriv):
+            if type(symb) != grammar.NonTerminal:
+                continue
+            left = _derive_shortest(deriv[:i], shortest)
+            right = _derive_shortest(deriv[i + 1:], shortest)
+            if left is None or right is None:
+                continue
+            candidate = (outer[0] + left, right + outer[1])
+            current = contexts.get(symb)
+            if current is None or len(candidate[0]) + len(candidate[1]) < len(current[0]) + len(current[1]):
+                contexts[symb] = candidate
+                changed = True
+        return changed
+
+    for deriv in g.rules(root):
+        relax(('', ''), deriv)
+    changes = True
+    while changes:
+        changes = False
+        for nterm, deriv in g:
+            if nterm in contexts and relax(contexts[nterm], deriv):
+                changes = True
+    return contexts
+
+
+def find_hot_spots(g: 'grammar.Grammar', max_k: int = 3) -> List[HotSpot]:
+    """
+    Finds non-terminals which can cause exponential backtracking
+    of recursive descent parsing.
+
+    Recursive descent parsing tries every alternative consistent with
+    the input, so alternatives that overlap by lookahead are tried one
+    after another, and if the non-terminal is recursive, the amount of
+    tries is multiplied by every level of recursion.
+
+    :param g: prepared grammar.
+    :param max_k: lookahead used to distinguish overlaps and ambiguities.
+    :return: hot spots sorted from the most dangerous.
+    """
+    vanishing = g._vanishing()
+    shortest = _shortest_words(g)
+    first_la = g.build_lookahead(1)
+    max_la = g.build_lookahead(max_k)
+    spots: List[HotSpot] = list()
+
+    recursive = {nterm for nterm in g.nterms() if nterm in _contexts(g, nterm, shortest)}
+
+    for nterm in g.nterms():
+        rec = nterm in recursive
+        weight = 2 if rec else 1
+
+        # Alternatives that are tried on the same input.
+        overlaps: Dict[Tuple[grammar.Derivation, ...], str] = dict()
+        for (la_nterm, s), derivs in first_la.items():
+            if la_nterm == nterm and len(derivs) > 1:
+                overlaps.setdefault(tuple(sorted(derivs, key=repr)), s)
+        for derivs, s in overlaps.items():
+            ambiguous = False
+            for (la_nterm, long_s), long_derivs in max_la.items():
+                if la_nterm == nterm and long_s.startswith(s) and len(long_derivs & set(derivs)) > 1:
+                    ambiguous = True
+                    s = long_s
+                    break
+            kind = 'ambiguous' if ambiguous else 'overlap'
+            score = len(derivs) * weight * (2 if ambiguous else 1)
+            spots.append(HotSpot(nterm, kind, s, derivs, rec, score))
+
+        nullable = [d for d in g.rules(nterm) if all(type(x) == grammar.NonTerminal and x in vanishing for x in d)]
+        if len(nullable) > 1:
+            spots.append(HotSpot(nterm, 'ambiguous', '', tuple(sorted(nullable, key=repr)), rec,
+                                 len(nullable) * weight * 2))
+
+        tails = list()
+        for deriv in g.rules(nterm):
+            if len(deriv) > 1 and type(deriv[-1]) == grammar.NonTerminal and deriv[-1] in vanishing:
+                tails.append(deriv)
+        if len(tails) > 0:
+            spots.append(HotSpot(nterm, 'nullable-tail', '', tuple(sorted(tails, key=repr)), rec,
+                                 len(tails) * weight))
+
+    spots.sort(key=lambda spot: -spot.score)
+    return spots
+
+
+def _junk_symbol(g: 'grammar.Grammar') -> str:
+    """
+    Returns symbol that isn't used by the grammar.
+    :param g: Grammar.
+    :return: str
+    """
+    terminals = {symb for _, deriv in g for symb in deriv if type(symb) != grammar.NonTerminal}
+    code = 0
+    while chr(code) in terminals:
+        code += 1
+    return chr(code)
+
+
+def adversarial_word(g: 'grammar.Grammar', spot: HotSpot, n: int) -> Optional[str]:
+    """
+    Generates word that makes the parser backtrack on the hot spot n times in a row.
+
+    The word is uA^nv, where uAv is the shortest context of the
+    non-terminal A, A^n is A pumped n times by its shortest recursion
+    (or the overlapping lookahead repeated if the recursion doesn't
+    exist), and the word ends by foreign symbol, so it is rejected only
+    after all alternatives are tried.
+
+    :param g: prepared grammar.
+    :param spot: the hot spot.
+    :param n: amount of repetitions.
+    :return: str or None if the non-terminal is unreachable or dead.
+    """
+    shortest = _shortest_words(g)
+    if spot.nterm not in shortest:
+        return None
+    if spot.nterm == g.initial():
+        outer = ('', '')
+    else:
+        outer = _contexts(g, g.initial(), shortest).get(spot.nterm)
+        if outer is None:
+            return None
+    pump = _contexts(g, spot.nterm, shortest).get(spot.nterm)
+    if pump is None or len(pump[0]) + len(pump[1]) == 0:
+        core = spot.lookahead * n + shortest[spot.nterm]
+    else:
+        core = pump[0] * n + spot.lookahead + shortest[spot.nterm] + pump[1] * n
+    return outer[0] + core + outer[1] + _junk_symbol(g)
+
+
+def confirm_hot_spot(g: 'grammar.Grammar', spot: HotSpot, first: 'grammar.grammar.First' = None,
+                     max_n: int = 32, time_limit: float = 1.0, max_exponent: float = 3.0,
+                     max_steps: int = 20000) -> Confirmation:
+    """
+    Measures checking of adversarial words of growing length.
+
+    Amount of repetitions doubles until checking exceeds the budget
+    (it is aborted then) or max_n is reached and the longest word is at
+    least twice longer than the shortest one. Growth exponent is the slope
+    of log(steps) by log(len) fitted by least squares over the last
+    FIT_POINTS completed checks(or more, so that their lengths differ at
+    least twice). Steps don't depend on the machine load, so the same
+    grammar always gets the same answer, the time limit is only a safety
+    net and must be above the time of max_steps expansions.
+    If the budget is exceeded before two such words are checked,
+    the growth is too fast to measure and the exponent is infinite.
+
+    :param g: prepared grammar.
+    :param spot: the hot spot.
+    :param first: mapping used by check_word, FIRST by default.
+    :param max_n: maximal amount of repetitions.
+    :param time_limit: abort checking which takes longer.
+    :param max_exponent: growth faster than the polynomial of the degree confirms the hot spot.
+    :param max_steps: abort checking which takes more expansions.
+    :return: Confirmation
+    """
+    if first is None:
+        first = g.build_first()
+    lengths: List[int] = list()
+    timings: List[float] = list()
+    steps: List[int] = list()
+    exceeded = False
+    n = 1
+    while n <= max_n or (len(lengths) > 0 and lengths[-1] < 2 * lengths[0]):
+        word = adversarial_word(g, spot, n)
+        if word is None or (len(lengths) > 0 and len(word) == lengths[-1]):
+            break
+        result = g.check(word, first, grammar.Budget(max_steps, time_limit))
+        if result.verdict == grammar.Verdict.UNKNOWN:
+            exceeded = True
+            break
+        timings.append(result.seconds)
+        steps.append(result.steps)
+        lengths.append(len(word))
+        n *= 2
+
+    exponent = 0.0
+    if len(lengths) >= 2 and lengths[-1] >= 2 * lengths[0]:
+        start = max(len(lengths) - FIT_POINTS, 0)
+        while lengths[-1] < 2 * lengths[start]:
+            start -= 1
+        xs = [math.log(length) for length in lengths[start:]]
+        ys = [math.log(max(s, 1)) for s in steps[start:]]
+        mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+        exponent = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / \
+            sum((x - mean_x) ** 2 for x in xs)
+    elif exceeded:
+        exponent = math.inf
+    return Confirmation(spot, tuple(lengths), tuple(timings), tuple(steps), exponent, exponent > max_exponent)
+
+
+def backtracking_gate(g: 'grammar.Grammar', max_spots: int = 5, **kwargs) -> List[Confirmation]:
+    """
+    Confirms the most dangerous hot spots of the grammar.
+
+    Only the most dangerous hot spot of every non-terminal is
+    measured, so one non-terminal doesn't take all the places.
+
+    :param g: prepared grammar.
+    :param max_spots: amount of non-terminals to measure.
+    :param kwargs: arguments of confirm_hot_spot.
+    :return: confirmed hot spots, empty list means the grammar passes.
+    """
+    first = kwargs.pop('first', None)
+    if first is None:
+        first = g.build_first()
+    # Hot spots are sorted from the most dangerous,
+    # so the first one of the non-terminal is kept.
+    spots: Dict[grammar.NonTerminal, HotSpot] = dict()
+    for spot in find_hot_spots(g):
+        spots.setdefault(spot.nterm, spot)
+    confirmed = list()
+    for spot in list(spots.values())[:max_spots]:
+        c = confirm_hot_spot(g, spot, first, **kwargs)
+        if c.confirmed:
+            confirmed.append(c)
+    return confirmed
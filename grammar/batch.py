@@ -0,0 +1,179 @@
+__all__ = ['check_prefix_tree', 'check_batch']
+from typing import Dict, Iterable, List, Set, Tuple
+import grammar
+
+
+class _TrieNode:
+    """
+    Node of prefix tree of words.
+    """
+    __slots__ = ('children', 'words')
+
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = dict()
+        self.words: List[int] = list()
+
+
+def _build_trie(words: Iterable[str]) -> Tuple[_TrieNode, int]:
+    """
+    Builds prefix tree of the words, equal words share the node.
+    :param words: words.
+    :return: root and amount of words.
+    """
+    root = _TrieNode()
+    amount = 0
+    for index, word in enumerate(words):
+        node = root
+        for symb in word:
+            child = node.children.get(symb)
+            if child is None:
+                child = _TrieNode()
+                node.children[symb] = child
+            node = child
+        node.words.append(index)
+        amount += 1
+    return root, amount
+
+
+# Rule of non-terminal and position of the dot in it.
+Slot = Tuple['grammar.NonTerminal', 'grammar.Derivation', int]
+
+
+class _StackNode:
+    """
+    Node of graph-structured stack: call of the non-terminal at the node of prefix tree.
+
+    All prediction stacks which call the non-terminal at the same
+    node share it, so stacks are never copied and their amount
+    doesn't grow exponentially.
+    """
+    __slots__ = ('returns', 'popped')
+
+    def __init__(self):
+        # Slots to continue after the non-terminal
+        # and stack nodes of the slots, None for
+        # the call of the initial non-terminal.
+        self.returns: Set[Tuple[Slot, '_StackNode']] = set()
+        # Nodes of prefix tree where the
+        # non-terminal was recognized.
+        self.popped: Set[_TrieNode] = set()
+
+
+Descriptor = Tuple[Slot, _StackNode, _TrieNode]
+
+
+def _traverse(g: 'grammar.Grammar', words: Iterable[str], lookahead: 'grammar.Lookahead',
+              budget: 'grammar.Budget') -> List['grammar.Verdict']:
+    """
+    Checks the words by generalized LL parsing over their prefix tree.
+
+    Descriptor is a slot, the stack node to return to and the node of
+    prefix tree, every descriptor is processed once. Terminals move
+    descriptors to children of the node, calls of non-terminals are
+    shared through stack nodes, and recognized non-terminals are
+    remembered in them, so later callers continue without reparsing.
+
+    :param g: grammar without left-recursion.
+    :param words: words for check.
+    :param lookahead: 1-lookahead mapping of the grammar, built if not suitable.
+    :param budget: limit of descriptors and time, if given.
+    :return: verdicts in order of words, UNKNOWN for words not accepted within the budget.
+    """
+    if lookahead is None or lookahead.k != 1:
+        lookahead = g.build_lookahead(1)
+    root, amount = _build_trie(words)
+    verdicts = [grammar.Verdict.REJECT] * amount
+
+    calls: Dict[Tuple[grammar.NonTerminal, _TrieNode], _StackNode] = dict()
+    seen: Set[Descriptor] = set()
+    queue: List[Descriptor] = list()
+
+    def add(slot: Slot, stack: _StackNode, node: _TrieNode):
+        descriptor = (slot, stack, node)
+        if descriptor not in seen:
+            if budget is not None:
+                budget.step()
+            seen.add(descriptor)
+            queue.append(descriptor)
+
+    def call(nterm: grammar.NonTerminal, node: _TrieNode, slot: Slot, parent: _StackNode):
+        stack = calls.get((nterm, node))
+        if stack is None:
+            stack = _StackNode()
+            calls[(nterm, node)] = stack
+            # Only rules that can start some
+            # continuation of the node are tried.
+            keys = list(node.children.keys())
+            if len(node.words) > 0:
+                keys.append('')
+            for key in keys:
+                for deriv in lookahead.get((nterm, key), grammar.grammar.empty_set):
+                    add((nterm, deriv, 0), stack, node)
+        if (slot, parent) not in stack.returns:
+            stack.returns.add((slot, parent))
+            if slot is not None:
+                for popped in list(stack.popped):
+                    add(slot, parent, popped)
+
+    try:
+        call(g.initial(), root, None, None)
+        while len(queue) > 0:
+            (nterm, deriv, dot), stack, node = queue.pop()
+            if dot < len(deriv):
+                symb = deriv[dot]
+                if type(symb) == grammar.NonTerminal:
+                    call(symb, node, (nterm, deriv, dot + 1), stack)
+                elif symb in node.children:
+                    add((nterm, deriv, dot + 1), stack, node.children[symb])
+                continue
+            if node in stack.popped:
+                continue
+            stack.popped.add(node)
+            for slot, parent in list(stack.returns):
+                if slot is None:
+                    for index in node.words:
+                        verdicts[index] = grammar.Verdict.ACCEPT
+                else:
+                    add(slot, parent, node)
+    except grammar.BudgetExceeded:
+        verdicts = [grammar.Verdict.UNKNOWN if v == grammar.Verdict.REJECT else v for v in verdicts]
+    return verdicts
+
+
+def check_prefix_tree(g: 'grammar.Grammar', words: Iterable[str], lookahead: 'grammar.Lookahead' = None) -> List[bool]:
+    """
+    Checks many words at once sharing work on their common prefixes.
+
+    Words are put into prefix tree, then the tree is parsed by
+    generalized LL parsing with graph-structured stack, so a common
+    prefix is parsed once, every alternative is followed at once
+    without backtracking, and the time is polynomial even for
+    ambiguous grammars. Equal words are checked once.
+
+    :param g: grammar without left-recursion.
+    :param words: words for check.
+    :param lookahead: 1-lookahead mapping of the grammar, built if not given.
+    :return: verdicts in order of words.
+    """
+    return [verdict == grammar.Verdict.ACCEPT for verdict in _traverse(g, words, lookahead, None)]
+
+
+def check_batch(g: 'grammar.Grammar', words: Iterable[str], budget: 'grammar.Budget' = None,
+                lookahead: 'grammar.Lookahead' = None) -> List['grammar.CheckResult']:
+    """
+    Checks many words at once within the budget shared by the whole batch.
+
+    The same as check_prefix_tree, but words which weren't accepted
+    before the budget was over get UNKNOWN verdict.
+
+    :param g: grammar without left-recursion.
+    :param words: words for check.
+    :param budget: limit of descriptors and time, it is restarted, unlimited if not given.
+    :param lookahead: 1-lookahead mapping of the grammar, built if not given.
+    :return: results in order of words, statistics are of the whole batch.
+    """
+    if budget is None:
+        budget = grammar.Budget()
+    budget.start()
+    verdicts = _traverse(g, words, lookahead, budget)
+    return [budget.result(verdict) for verdict in verdicts]
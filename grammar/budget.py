@@ -0,0 +1,125 @@
+__all__ = ['Verdict', 'Budget', 'BudgetExceeded', 'CheckResult']
+from typing import NamedTuple, Optional
+import enum
+import time
+import grammar
+
+
+class Verdict(enum.Enum):
+    """
+    Result of checking of a word with limited budget.
+    """
+    ACCEPT = 'accept'
+    REJECT = 'reject'
+    UNKNOWN = 'unknown'
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+class CheckResult(NamedTuple):
+    """
+    Result of checking of a word.
+
+    verdict -- ACCEPT, REJECT or UNKNOWN if the budget was exceeded;
+    steps   -- amount of expansions of non-terminals performed;
+    seconds -- wall time of checking;
+    failure -- the furthest failure of rejected word, if it was collected.
+    """
+    verdict: Verdict
+    steps: int
+    seconds: float
+    failure: Optional['grammar.Failure'] = None
+
+
+class Budget:
+    """
+    Limit of expansions of non-terminals and of wall time.
+
+    Parsers call step() on every expansion, it only decrements
+    the counter, limits are checked once per CHECK_PERIOD steps
+    (or exactly when the steps limit is close).
+    """
+
+    CHECK_PERIOD = 1024
+
+    def __init__(self, max_steps: int = None, seconds: float = None):
+        """
+        Constructs the budget, it can be reused after start().
+        :param max_steps: maximal amount of expansions, unlimited if None.
+        :param seconds: maximal wall time, unlimited if None.
+        """
+        self.max_steps = max_steps
+        self.seconds = seconds
+        self.start()
+
+    def start(self):
+        """
+        Resets spent steps and starts the clock.
+        :return: none.
+        """
+        self.__started = time.perf_counter()
+        self.__deadline = None if self.seconds is None else self.__started + self.seconds
+        self.__spent = 0
+        self.__chunk = 0
+        self.__next_chunk()
+
+    def __next_chunk(self):
+        """
+        Determines amount of steps until the next check.
+        :return: none.
+        """
+        chunk = self.CHECK_PERIOD
+        if self.max_steps is not None:
+            chunk = min(chunk, self.max_steps - self.__spent)
+        self.__chunk = chunk
+        self.countdown = chunk
+
+    def step(self):
+        """
+        Spends one step.
+        :return: none.
+        :raises: BudgetExceeded if the budget is over.
+        """
+        self.countdown -= 1
+        if self.countdown <= 0:
+            self.__check()
+
+    def __check(self):
+        """
+        Checks the limits after the chunk of steps is spent.
+        :return: none.
+        :raises: BudgetExceeded if the budget is over.
+        """
+        self.__spent += self.__chunk - self.countdown
+        if self.max_steps is not None and self.__spent >= self.max_steps:
+            self.__chunk = self.countdown = 1
+            raise BudgetExceeded("Steps limit {} is reached.".format(self.max_steps))
+        if self.__deadline is not None and time.perf_counter() > self.__deadline:
+            self.__chunk = self.countdown = 1
+            raise BudgetExceeded("Time limit {}s is reached.".format(self.seconds))
+        self.__next_chunk()
+
+    def steps(self) -> int:
+        """
+        Returns amount of spent steps.
+        :return: int
+        """
+        return self.__spent + self.__chunk - self.countdown
+
+    def elapsed(self) -> float:
+        """
+        Returns wall time since the start.
+        :return: float
+        """
+        return time.perf_counter() - self.__started
+
+    def result(self, verdict: Verdict, failure: 'grammar.Failure' = None) -> CheckResult:
+        """
+        Returns result with the current statistics.
+        :param verdict: Verdict
+        :param failure: the furthest failure, if collected.
+        :return: CheckResult
+        """
+        return CheckResult(verdict, self.steps(), self.elapsed(), failure)
@@ -0,0 +1,136 @@
+__all__ = ['ByteTables', 'build_byte_tables', 'BytesLike']
+from typing import Dict, List, Tuple, Union
+import grammar
+
+BytesLike = Union[bytes, bytearray, memoryview]
+# Symbols of compiled rules: bytes are terminals,
+# NTERM_BASE + index are non-terminals.
+NTERM_BASE = 256
+# Index of FIRST entries used at the end of input.
+END = 256
+CompiledDerivation = Tuple[int, ...]
+
+
+class ByteTables:
+    """
+    Grammar compiled for checking of byte strings.
+
+    Terminals are byte values(characters 0-255 of the grammar),
+    non-terminals are NTERM_BASE + index. For every non-terminal
+    FIRST is a list of 257 entries indexed by the next byte(END at
+    the end of input): rules predicted by FIRST followed by the rules
+    recursive_descent_parsing tries by brute force(except the ones
+    starting by other bytes), so there are no dictionary lookups.
+    """
+
+    def __init__(self, initial: int, first: List[List[Tuple[CompiledDerivation, ...]]],
+                 starts: List[Tuple[int, ...]]):
+        """
+        Constructs the tables.
+        :param initial: compiled initial non-terminal.
+        :param first: ordered rules by non-terminal index and next byte.
+        :param starts: bytes starting rules by non-terminal index.
+        """
+        self.initial = initial
+        self.first = first
+        self.starts = starts
+
+    def parsing(self, word: BytesLike, pos: int, predicted: CompiledDerivation,
+                budget: 'grammar.Budget' = None, tracker: 'grammar.FailureTracker' = None) -> bool:
+        """
+        Determines can the rest of the word be constructed by the prediction.
+
+        The word is read by offset, it is never copied.
+
+        :param word: bytes, bytearray or memoryview of bytes.
+        :param pos: offset of the rest of the word.
+        :param predicted: compiled prediction word.
+        :param budget: spent on every expansion of non-terminal, if given.
+        :param tracker: collects the furthest failure, if given.
+        :return: bool
+        :raises: BudgetExceeded if the budget is over.
+        """
+        len_word = len(word)
+        for i, symb in enumerate(predicted):
+            if symb >= NTERM_BASE:
+                if budget is not None:
+                    budget.step()
+                rest = predicted[i + 1:]
+                byte = word[pos] if pos < len_word else END
+                if tracker is not None and pos >= tracker.position:
+                    # Rules starting by other bytes
+                    # are skipped, but they are expected.
+                    tracker.expect(pos, (chr(b) for b in self.starts[symb - NTERM_BASE] if b != byte))
+                for derivation in self.first[symb - NTERM_BASE][byte]:
+                    if self.parsing(word, pos, derivation + rest, budget, tracker):
+                        return True
+                return False
+            if pos >= len_word or word[pos] != symb:
+                if tracker is not None and pos >= tracker.position:
+                    tracker.expect(pos, (chr(symb),))
+                return False
+            pos += 1
+        if pos != len_word and tracker is not None:
+            tracker.expect(pos, ('',))
+        return pos == len_word
+
+    def check_word(self, word: BytesLike, budget: 'grammar.Budget' = None,
+                   tracker: 'grammar.FailureTracker' = None) -> bool:
+        """
+        Returns is the word contained by the grammar.
+        :param word: bytes, bytearray or memoryview of bytes.
+        :param budget: limit of expansions and time, it is not restarted.
+        :param tracker: collects the furthest failure, if given.
+        :return: bool
+        :raises: BudgetExceeded if the budget is over.
+        """
+        if isinstance(word, memoryview) and word.format != 'B':
+            word = word.cast('B')
+        return self.parsing(word, 0, (self.initial,), budget, tracker)
+
+
+def build_byte_tables(g: 'grammar.Grammar') -> ByteTables:
+    """
+    Compiles the grammar for checking of byte strings.
+    :param g: prepared grammar, its terminals must be characters 0-255.
+    :return: ByteTables
+    :raises: ValueError if some terminal isn't a byte.
+    """
+    nterms = g.nterms()
+    if g.initial() not in nterms:
+        nterms.append(g.initial())
+    index: Dict[grammar.NonTerminal, int] = {nterm: NTERM_BASE + i for i, nterm in enumerate(nterms)}
+
+    def compile_symbol(symb) -> int:
+        if type(symb) == grammar.NonTerminal:
+            if symb not in index:
+                index[symb] = NTERM_BASE + len(index)
+            return index[symb]
+        code = ord(symb)
+        if code >= NTERM_BASE:
+            raise ValueError("Terminal {!r} isn't a byte.".format(symb))
+        return code
+
+    first: List[List[Tuple[CompiledDerivation, ...]]] = list()
+    starts: List[Tuple[int, ...]] = list()
+    for nterm in nterms:
+        compiled = [tuple(compile_symbol(symb) for symb in deriv) for deriv in sorted(g.rules(nterm), key=repr)]
+        empty = tuple(c for c in compiled if len(c) == 0)
+        others = tuple(c for c in compiled if len(c) > 0 and c[0] >= NTERM_BASE)
+        starts.append(tuple(sorted({c[0] for c in compiled if len(c) > 0 and c[0] < NTERM_BASE})))
+        entries = list()
+        for byte in range(END + 1):
+            if byte == END:
+                entries.append(empty + others)
+                continue
+            # Rules starting by other terminals can't
+            # construct the rest, so they are left out
+            # of brute force.
+            predicted = tuple(c for c in compiled if len(c) > 0 and c[0] == byte)
+            entries.append(predicted + empty + others)
+        first.append(entries)
+    # Non-terminals without rules.
+    while len(first) < len(index):
+        first.append([()] * (END + 1))
+        starts.append(())
+    return ByteTables(index[g.initial()], first, starts)
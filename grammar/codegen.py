@@ -0,0 +1,233 @@
+__all__ = ['generate_source', 'compile_parser']
+from typing import Dict, List, Set
+import hashlib
+import importlib.util
+import os
+import stat
+import tempfile
+import grammar
+
+# If there are more different first symbols,
+# dispatch is performed by dictionary instead of if-chain.
+MAX_IF_DISPATCH = 8
+
+_loaded: Dict[str, object] = dict()
+
+
+def _func_name(nterm: 'grammar.NonTerminal') -> str:
+    """
+    Returns name of the function of the non-terminal.
+    :param nterm: NonTerminal
+    :return: str
+    """
+    return "_n{}".format(nterm) if nterm >= 0 else "_nm{}".format(-nterm)
+
+
+def _sequence(deriv: 'grammar.Derivation', pos: str, cont: str, depth: int,
+              classes: Dict['grammar.NonTerminal', str], tables: Set['grammar.NonTerminal']) -> str:
+    """
+    Returns expression that is true if the derivation is matched
+    from the position and continuation accepts the rest.
+
+    Every continuation adds frames to the stack, so terminals and
+    non-terminals matching one symbol are checked inline, and
+    non-terminals dispatched only by table are called through it.
+
+    :param deriv: rest of derivation.
+    :param pos: expression of the position.
+    :param cont: expression of continuation.
+    :param depth: nesting level of lambdas, used for variables names.
+    :param classes: non-terminals matching one symbol, as set expressions of the symbols.
+    :param tables: non-terminals whose rules are dispatched only by table.
+    :return: str
+    """
+    if len(deriv) == 0:
+        return "{}({})".format(cont, pos)
+    terminals = 0
+    while terminals < len(deriv) and type(deriv[terminals]) != grammar.NonTerminal:
+        terminals += 1
+    if terminals > 0:
+        prefix = ''.join(deriv[:terminals])
+        rest = _sequence(deriv[terminals:], "{} + {}".format(pos, terminals), cont, depth, classes, tables)
+        return "w.startswith({!r}, {}) and {}".format(prefix, pos, rest)
+    nterm = deriv[0]
+    if nterm in classes:
+        rest = _sequence(deriv[1:], "{} + 1".format(pos), cont, depth, classes, tables)
+        return "w[{0}:{0} + 1] in {1} and {2}".format(pos, classes[nterm], rest)
+    if nterm in tables:
+        call = "{0}_table.get(w[{1}:{1} + 1], _fail)".format(_func_name(nterm), pos)
+    else:
+        call = _func_name(nterm)
+    if len(deriv) == 1:
+        return "{}(w, {}, {})".format(call, pos, cont)
+    var = "j{}".format(depth)
+    rest = _sequence(deriv[1:], var, cont, depth + 1, classes, tables)
+    return "{}(w, {}, lambda {}: {})".format(call, pos, var, rest)
+
+
+def _alternatives(lines: List[str], derivs: List['grammar.Derivation'], skip: int, indent: str,
+                  classes: Dict['grammar.NonTerminal', str], tables: Set['grammar.NonTerminal']):
+    """
+    Writes checks of alternatives, the first symbols of which can be already matched.
+    :param lines: output.
+    :param derivs: alternatives.
+    :param skip: amount of already matched symbols.
+    :param indent: indentation.
+    :param classes: see _sequence.
+    :param tables: see _sequence.
+    :return: none.
+    """
+    for deriv in derivs:
+        lines.append("{}if {}:".format(indent, _sequence(deriv[skip:], "i + {}".format(skip), "k", 0,
+                                                        classes, tables)))
+        lines.append("{}    return True".format(indent))
+
+
+def generate_source(g: 'grammar.Grammar') -> str:
+    """
+    Generates Python module recognizing the language of the prepared grammar.
+
+    Every non-terminal becomes function f(w, i, k), which is true if
+    some its rule matches w from position i and continuation k accepts
+    the position after it. Alternatives are dispatched by their first
+    terminal(like FIRST prediction), the others are tried after that,
+    so backtracking semantics is the same as of recursive_descent_parsing.
+    Continuations return only when parsing ends, so the stack grows with
+    the word like in recursive_descent_parsing: non-terminals matching
+    one symbol are inlined and table dispatch is done by the caller to
+    keep it as shallow.
+
+    Module has check_word(word) function.
+
+    :param g: grammar without left-recursion.
+    :return: str
+    """
+    nterms = set(g.nterms())
+    nterms.add(g.initial())
+    for _, deriv in g:
+        for symb in deriv:
+            if type(symb) == grammar.NonTerminal:
+                nterms.add(symb)
+
+    alternatives: Dict[grammar.NonTerminal, tuple] = dict()
+    classes: Dict[grammar.NonTerminal, str] = dict()
+    tables: Set[grammar.NonTerminal] = set()
+    for nterm in nterms:
+        groups: Dict[str, List[grammar.Derivation]] = dict()
+        others: List[grammar.Derivation] = list()
+        for deriv in sorted(g.rules(nterm), key=repr):
+            if len(deriv) > 0 and type(deriv[0]) != grammar.NonTerminal:
+                groups.setdefault(deriv[0], list()).append(deriv)
+            else:
+                others.append(deriv)
+        alternatives[nterm] = (groups, others)
+        if len(groups) > 0 and len(others) == 0:
+            if all(len(deriv) == 1 for derivs in groups.values() for deriv in derivs):
+                classes[nterm] = "{{{}}}".format(", ".join(repr(symb) for symb in sorted(groups)))
+            elif len(groups) > MAX_IF_DISPATCH:
+                tables.add(nterm)
+
+    lines = ["# Generated by grammar.codegen, do not edit.", "", "",
+             "def _fail(w, i, k):",
+             "    return False"]
+    for nterm in sorted(nterms):
+        name = _func_name(nterm)
+        groups, others = alternatives[nterm]
+        dispatch = len(groups) > MAX_IF_DISPATCH
+        if dispatch:
+            table = list()
+            for n, (symb, derivs) in enumerate(sorted(groups.items())):
+                helper = "{}_{}".format(name, n)
+                table.append("{!r}: {}".format(symb, helper))
+                lines += ["", "", "def {}(w, i, k):".format(helper)]
+                _alternatives(lines, derivs, 1, "    ", classes, tables)
+                lines.append("    return False")
+            lines += ["", "", "{}_table = {{{}}}".format(name, ", ".join(table))]
+
+        lines += ["", "", "def {}(w, i, k):".format(name)]
+        if dispatch:
+            lines.append("    f = {}_table.get(w[i:i + 1])".format(name))
+            lines.append("    if f is not None and f(w, i, k):")
+            lines.append("        return True")
+        elif len(groups) > 0:
+            lines.append("    c = w[i:i + 1]")
+            keyword = "if"
+            for symb, derivs in sorted(groups.items()):
+                lines.append("    {} c == {!r}:".format(keyword, symb))
+                _alternatives(lines, derivs, 1, "        ", classes, tables)
+                keyword = "elif"
+        _alternatives(lines, others, 0, "    ", classes, tables)
+        lines.append("    return False")
+
+    lines += ["", "", "def check_word(w):",
+              "    n = len(w)",
+              "    return {}(w, 0, lambda j: j == n)".format(_func_name(g.initial())), ""]
+    return "\n".join(lines)
+
+
+def _default_cache_dir() -> str:
+    """
+    Returns per-user directory for generated modules.
+    :return: str
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "grammar_parsers")
+
+
+def _private_dir(path: str):
+    """
+    Creates the directory accessible only by the user if it doesn't exist
+    and checks that other users can't write into it.
+    :param path: path of the directory.
+    :return: none.
+    :raises: PermissionError if the directory belongs to another user or is writable by others.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode):
+        raise PermissionError("{} isn't a directory.".format(path))
+    if hasattr(os, "getuid") and (st.st_uid != os.getuid() or st.st_mode & 0o022):
+        raise PermissionError("{} must belong to the user and be writable only by them.".format(path))
+
+
+def compile_parser(g: 'grammar.Grammar', cache_dir: str = None):
+    """
+    Returns module generated by generate_source.
+
+    Modules are cached on the disk by hash of their source,
+    so the same grammar is compiled once, the next times
+    only the module(and its bytecode) is loaded. The cache
+    directory must be writable only by the user, and cached
+    module is executed only if it equals the generated source,
+    otherwise it is written again.
+
+    :param g: grammar without left-recursion.
+    :param cache_dir: directory for modules, grammar_parsers in the user cache directory by default.
+    :return: module with check_word(word) function.
+    :raises: PermissionError if the cache directory isn't private.
+    """
+    if cache_dir is None:
+        cache_dir = _default_cache_dir()
+    source = generate_source(g)
+    name = "grammar_parser_" + hashlib.sha256(source.encode('utf-8')).hexdigest()[:24]
+    path = os.path.join(cache_dir, name + ".py")
+    if path in _loaded:
+        return _loaded[path]
+
+    _private_dir(cache_dir)
+    try:
+        with open(path, encoding="utf-8") as file:
+            cached = file.read()
+    except (OSError, UnicodeDecodeError):
+        cached = None
+    if cached != source:
+        fd, tmp_path = tempfile.mkstemp(suffix=".py", dir=cache_dir)
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(source)
+        os.replace(tmp_path, path)
+
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    _loaded[path] = module
+    return module
@@ -0,0 +1,95 @@
+__all__ = ['Failure', 'FailureTracker']
+from typing import Iterable, NamedTuple, Set, Tuple, Union
+
+
+class Failure(NamedTuple):
+    """
+    The furthest position where parsing of a rejected word failed.
+
+    position -- offset in the word;
+    expected -- terminals any of which could continue parsing there,
+                '' means the end of the word;
+    found    -- symbol of the word at the position, '' at the end.
+    """
+    position: int
+    expected: Tuple[str, ...]
+    found: str
+
+
+class FailureTracker:
+    """
+    Collects the furthest failure during the normal parsing.
+
+    Parsers report every failed comparison with the absolute
+    position, and only the furthest ones are kept, so nothing
+    is done twice and rejected words don't need another pass.
+    """
+
+    def __init__(self, length: int):
+        """
+        Constructs the tracker for a word.
+        :param length: length of the word, parsers which slice
+        the word compute positions by lengths of the rests.
+        """
+        self.length = length
+        self.position = -1
+        self.expected: Set[str] = set()
+
+    def expect(self, position: int, symbs: Iterable[str]):
+        """
+        Records that one of the symbols was expected at the position.
+        :param position: offset in the word.
+        :param symbs: terminals, '' for the end of the word.
+        :return: none.
+        """
+        if position < self.position:
+            return
+        if position > self.position:
+            self.position = position
+            self.expected = set()
+        self.expected.update(symbs)
+
+    def expect_strings(self, position: int, found: str, strings: Iterable[str]):
+        """
+        Records failure of k-lookahead: the found symbols aren't any of the strings.
+
+        Failure is at the end of the longest common prefix of the
+        found symbols and the strings, the strings ending there
+        expect the end of the word. The string equal to the found
+        symbols isn't a failure, its rules are parsed further.
+
+        :param position: offset of the found symbols in the word.
+        :param found: next at most k symbols of the word.
+        :param strings: expected lookahead strings.
+        :return: none.
+        """
+        if position + len(found) < self.position:
+            return
+        matched = 0
+        expected: Set[str] = set()
+        for s in strings:
+            if s == found:
+                continue
+            common = 0
+            while common < len(s) and common < len(found) and s[common] == found[common]:
+                common += 1
+            if common > matched:
+                matched = common
+                expected = set()
+            if common == matched:
+                expected.add(s[common] if common < len(s) else '')
+        self.expect(position + matched, expected)
+
+    def failure(self, word: Union[str, bytes, bytearray, memoryview]) -> Failure:
+        """
+        Returns the furthest failure.
+        :param word: the checked word.
+        :return: Failure
+        """
+        position = max(self.position, 0)
+        found = ''
+        if position < len(word):
+            found = word[position]
+            if type(found) == int:
+                found = chr(found)
+        return Failure(position, tuple(sorted(self.expected)), found)
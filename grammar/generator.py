@@ -0,0 +1,304 @@
+__all__ = ['WordGenerator', 'write_words']
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Set, Tuple, Union
+import fractions
+import itertools
+import math
+import operator
+import random
+import grammar
+
+Symbol = Union['grammar.Terminal', 'grammar.NonTerminal']
+# Alternative of normalized grammar: one terminal or pair of symbols.
+Alternative = Tuple[Symbol, ...]
+
+
+def _without_vanishing(g: 'grammar.Grammar', vanishing: Set['grammar.NonTerminal']) -> 'grammar.Grammar':
+    """
+    Returns grammar without empty rules, the empty word is lost.
+
+    Every rule is replaced by all its variants without
+    some occurrences of vanishing non-terminals.
+
+    :param g: Grammar.
+    :param vanishing: vanishing non-terminals.
+    :return: Grammar
+    """
+    result = grammar.Grammar(g.initial())
+    for nterm, deriv in g:
+        positions = [i for i, symb in enumerate(deriv) if symb in vanishing and type(symb) == grammar.NonTerminal]
+        for mask in itertools.product((False, True), repeat=len(positions)):
+            dropped = {pos for pos, drop in zip(positions, mask) if drop}
+            variant = tuple(symb for i, symb in enumerate(deriv) if i not in dropped)
+            if len(variant) > 0:
+                result.add_rule(nterm, variant)
+    return result
+
+
+def _without_chains(g: 'grammar.Grammar') -> 'grammar.Grammar':
+    """
+    Returns grammar without chain productions A --> B.
+
+    Every non-terminal gets non-chain rules of all
+    non-terminals reachable from it by chain productions.
+
+    :param g: Grammar.
+    :return: Grammar
+    """
+    result = grammar.Grammar(g.initial())
+    for nterm in g.nterms():
+        reachable = {nterm}
+        queue = [nterm]
+        while len(queue) > 0:
+            for deriv in g.rules(queue.pop()):
+                if len(deriv) == 1 and type(deriv[0]) == grammar.NonTerminal and deriv[0] not in reachable:
+                    reachable.add(deriv[0])
+                    queue.append(deriv[0])
+        for other in reachable:
+            for deriv in g.rules(other):
+                if not (len(deriv) == 1 and type(deriv[0]) == grammar.NonTerminal):
+                    result.add_rule(nterm, deriv)
+    return result
+
+
+class WordGenerator:
+    """
+    Generator of words of the grammar of the given length.
+
+    The grammar is normalized(without empty rules, chain productions
+    and useless symbols, every rule is a terminal or pair of symbols),
+    then amounts of derivations of every length are counted by dynamic
+    programming, and derivations are sampled uniformly by the amounts.
+    If the grammar is unambiguous, words are sampled uniformly too,
+    otherwise words with more derivations are more frequent.
+
+    Amounts grow exponentially, so they are kept as floats with binary
+    exponent shared by all counts of the same length(floating-point
+    approach of Denise and Zimmermann). They are exact while less than
+    2^53 and have relative error about 1e-15 otherwise, what is enough
+    for sampling. Counting up to length n takes O(n^2) float
+    multiplications for every rule of two non-terminals, the tables
+    are extended on demand.
+    """
+
+    def __init__(self, g: 'grammar.Grammar', seed=None):
+        """
+        Constructs the generator.
+        :param g: Grammar, it isn't changed.
+        :param seed: seed of random generator.
+        """
+        self.random = random.Random(seed)
+        vanishing = g._vanishing()
+        self.__has_empty = g.initial() in vanishing
+        normal = _without_chains(_without_vanishing(g, vanishing))._remove_useless()
+        self.__initial = normal.initial()
+
+        # Binarization, new non-terminals are numbered
+        # after the maximal one.
+        next_nterm = normal.max_nterm() + 1
+        self.__alternatives: Dict[grammar.NonTerminal, List[Alternative]] = dict()
+        for nterm, deriv in normal:
+            while len(deriv) > 2:
+                self.__alternatives.setdefault(nterm, list()).append((deriv[0], next_nterm))
+                nterm, deriv = next_nterm, deriv[1:]
+                next_nterm += 1
+            self.__alternatives.setdefault(nterm, list()).append(deriv)
+
+        # Count of length n is mantissa * 2 ** exponents[n].
+        # Index 0 is never used, because every symbol
+        # derives at least one terminal.
+        self.__exponents: List[int] = [0]
+        self.__alt_counts: Dict[grammar.NonTerminal, List[List[float]]] = \
+            {nterm: [[0.0] for _ in alts] for nterm, alts in self.__alternatives.items()}
+        self.__counts: Dict[grammar.NonTerminal, List[float]] = {nterm: [0.0] for nterm in self.__alternatives}
+        self.__terminal_counts: List[float] = [0.0, 1.0]
+
+        # Minimal lengths of words derived from non-terminals.
+        self.__min_lengths: Dict[grammar.NonTerminal, int] = dict()
+        changes = True
+        while changes:
+            changes = False
+            for nterm, alts in self.__alternatives.items():
+                for alt in alts:
+                    lengths = [self.__min_lengths.get(symb) if type(symb) == grammar.NonTerminal else 1
+                               for symb in alt]
+                    if None in lengths:
+                        continue
+                    if sum(lengths) < self.__min_lengths.get(nterm, sum(lengths) + 1):
+                        self.__min_lengths[nterm] = sum(lengths)
+                        changes = True
+
+    def __symbol_counts(self, symb: Symbol) -> List[float]:
+        """
+        Returns mantissas of counts of derivations of the symbol by length.
+        :param symb: terminal or non-terminal.
+        :return: list, which mustn't be changed.
+        """
+        if type(symb) == grammar.NonTerminal:
+            return self.__counts[symb]
+        return self.__terminal_counts
+
+    def __pair_weights(self, alt: Alternative, n: int, exponent: int) -> Tuple[int, List[float]]:
+        """
+        Returns counts of every split of the length between two symbols.
+        :param alt: pair of symbols.
+        :param n: length.
+        :param exponent: binary exponent of the result.
+        :return: minimal length of the first symbol and counts from it.
+        """
+        exps = self.__exponents
+        if type(alt[0]) != grammar.NonTerminal:
+            return 1, [math.ldexp(self.__symbol_counts(alt[1])[n - 1], exps[n - 1] - exponent)]
+        if type(alt[1]) != grammar.NonTerminal:
+            return n - 1, [math.ldexp(self.__counts[alt[0]][n - 1], exps[n - 1] - exponent)]
+        # Lengths less than minimal ones
+        # have zero counts and are skipped.
+        left = self.__counts[alt[0]]
+        right = self.__counts[alt[1]]
+        low = self.__min_lengths[alt[0]]
+        high = n - self.__min_lengths[alt[1]]
+        return low, [math.ldexp(left[l] * right[n - l], exps[l] + exps[n - l] - exponent)
+                     for l in range(low, high + 1)]
+
+    def __extend(self, length: int):
+        """
+        Counts derivations up to the length.
+        :param length: maximal length.
+        :return: none.
+        """
+        exps = self.__exponents
+        while len(self.__terminal_counts) <= length:
+            self.__terminal_counts.append(0.0)
+        for n in range(len(exps), length + 1):
+            # Scales of products of counts of lesser
+            # lengths relatively to the biggest one.
+            if n == 1:
+                exponent = 0
+                scales = []
+            else:
+                exponent = max(exps[l] + exps[n - l] for l in range(1, n))
+                scales = [0.0] + [math.ldexp(1.0, exps[l] + exps[n - l] - exponent) for l in range(1, n)]
+
+            biggest = 0.0
+            for nterm, alts in self.__alternatives.items():
+                total = 0.0
+                for alt, alt_counts in zip(alts, self.__alt_counts[nterm]):
+                    if len(alt) == 1:
+                        c = 1.0 if n == 1 else 0.0
+                    elif type(alt[0]) != grammar.NonTerminal:
+                        c = self.__symbol_counts(alt[1])[n - 1] * scales[1] if n > 1 else 0.0
+                    elif type(alt[1]) != grammar.NonTerminal:
+                        c = self.__counts[alt[0]][n - 1] * scales[n - 1] if n > 1 else 0.0
+                    else:
+                        left = self.__counts[alt[0]]
+                        right = self.__counts[alt[1]]
+                        low = self.__min_lengths[alt[0]]
+                        high = n - self.__min_lengths[alt[1]]
+                        c = sum(map(operator.mul, map(operator.mul, left[low:high + 1],
+                                                      right[n - low:n - high - 1:-1]), scales[low:high + 1])) \
+                            if low <= high else 0.0
+                    alt_counts.append(c)
+                    total += c
+                self.__counts[nterm].append(total)
+                if total > biggest:
+                    biggest = total
+
+            # Normalization keeps mantissas near 1,
+            # counts of length 1 are kept as is,
+            # because terminals are counted by them.
+            shift = math.frexp(biggest)[1] if biggest > 0 and n > 1 else 0
+            for nterm, alts_counts in self.__alt_counts.items():
+                self.__counts[nterm][n] = math.ldexp(self.__counts[nterm][n], -shift)
+                for alt_counts in alts_counts:
+                    alt_counts[n] = math.ldexp(alt_counts[n], -shift)
+            exps.append(exponent + shift)
+
+    def count(self, length: int) -> int:
+        """
+        Returns amount of derivations of words of the length.
+        :param length: length of words.
+        :return: int, approximate if it is bigger than 2^53.
+        """
+        if length == 0:
+            return 1 if self.__has_empty else 0
+        if self.__initial not in self.__alternatives:
+            return 0
+        self.__extend(length)
+        return round(fractions.Fraction(self.__counts[self.__initial][length]) *
+                     fractions.Fraction(2) ** self.__exponents[length])
+
+    def __choose(self, weights: List[float]) -> int:
+        """
+        Returns random index with probability proportional to its weight.
+        :param weights: non-negative weights, some is positive.
+        :return: int
+        """
+        r = self.random.random() * sum(weights)
+        last = 0
+        for i, w in enumerate(weights):
+            if w > 0:
+                last = i
+                if r < w:
+                    return i
+                r -= w
+        # Rounding errors.
+        return last
+
+    def sample(self, length: int) -> Optional[str]:
+        """
+        Returns random word of the length.
+        :param length: length of the word.
+        :return: str or None if there are no words of the length.
+        """
+        if self.count(length) == 0:
+            return None
+        if length == 0:
+            return ''
+        word: List[str] = list()
+        stack: List[Tuple[Symbol, int]] = [(self.__initial, length)]
+        while len(stack) > 0:
+            symb, n = stack.pop()
+            if type(symb) != grammar.NonTerminal:
+                word.append(symb)
+                continue
+            alts = self.__alternatives[symb]
+            alt = alts[self.__choose([alt_counts[n] for alt_counts in self.__alt_counts[symb]])]
+            if len(alt) == 1:
+                word.append(alt[0])
+                continue
+            low, weights = self.__pair_weights(alt, n, self.__exponents[n])
+            split = low + self.__choose(weights)
+            stack.append((alt[1], n - split))
+            stack.append((alt[0], split))
+        return ''.join(word)
+
+    def stream(self, min_length: int, max_length: int, per_length: int = 1) -> Iterator[str]:
+        """
+        Generates random words of every length of the range.
+        :param min_length: minimal length.
+        :param max_length: maximal length(inclusive).
+        :param per_length: amount of words of every length.
+        :return: iterator of words, lengths without words are skipped.
+        """
+        self.count(max_length)
+        for length in range(min_length, max_length + 1):
+            if self.count(length) == 0:
+                continue
+            for _ in range(per_length):
+                yield self.sample(length)
+
+
+def write_words(words: Iterable[str], file: IO, truth: bool = True):
+    """
+    Writes words in the format of test files.
+    :param words: words.
+    :param file: text file.
+    :param truth: expectation of the words.
+    :return: none.
+    :raises: ValueError if some word contains newline symbol.
+    """
+    file.write("[true]\n" if truth else "[false]\n")
+    for word in words:
+        if '\n' in word:
+            raise ValueError("Word with newline symbol can't be written.")
+        file.write(word)
+        file.write('\n')
@@ -73,6 +73,8 @@ class Grammar:
             r = dict()
         self.__inital = initial
         self.__rules = r
+        # Compiled on demand, dropped on every change.
+        self.__byte_tables: 'grammar.ByteTables' = None
 
     def __eq__(self, other: 'Grammar') -> bool:
         """
@@ -89,6 +91,28 @@ class Grammar:
                 return False
         return True
 
+    def initial(self) -> NonTerminal:
+        """
+        Returns starting non-terminal of the grammar.
+        :return: NonTerminal
+        """
+        return self.__inital
+
+    def rules(self, nterm: NonTerminal) -> Set[Derivation]:
+        """
+        Returns rules of the non-terminal, must not be modified.
+        :param nterm: left side of productions.
+        :return: Set[Derivation], empty if there are no rules.
+        """
+        return self.__rules.get(nterm, empty_set)
+
+    def nterms(self) -> List[NonTerminal]:
+        """
+        Returns non-terminals that have rules.
+        :return: List[NonTerminal]
+        """
+        return list(self.__rules.keys())
+
     def max_nterm(self) -> NonTerminal:
         """
         Returns maximal(by natural integer order) non-terminal symbol.
@@ -117,6 +141,20 @@ class Grammar:
                     minimal = symbol
         return minimal
 
+    def rules_count(self) -> int:
+        """
+        Returns amount of rules in the grammar.
+        :return: int
+        """
+        return sum(len(deriv_set) for deriv_set in self.__rules.values())
+
+    def nterms_count(self) -> int:
+        """
+        Returns amount of non-terminals that have rules.
+        :return: int
+        """
+        return len(self.__rules)
+
     def add_rule(self, nterm: NonTerminal, *derivs):
         """
         Adds rules to the grammar.
@@ -124,6 +162,7 @@ class Grammar:
         :param derivs: rules of production.
         :return: None
         """
+        self.__byte_tables = None
         for d in derivs:
             if nterm not in self.__rules:
                 self.__rules[nterm] = set()
@@ -137,6 +176,7 @@ class Grammar:
         :return: None
         :raises: KeyError if nterm rules don't exist in grammar.
         """
+        self.__byte_tables = None
         self.__rules[nterm].remove(deriv)
         if len(self.__rules[nterm]) == 0:
             del self.__rules[nterm]
@@ -614,6 +654,7 @@ class Grammar:
 
                 self.__rules[A_i] = A_i_derivs
                 self.__rules[A_dot] = A_dot_derivs
+                self.__byte_tables = None
 
         return self
 
@@ -668,17 +709,79 @@ class Grammar:
         """
         return self._remove_dead()._remove_unreachable()
 
-    def prepare_for_checking(self) -> 'Grammar':
+    def _merge_equivalent(self) -> 'Grammar':
+        """
+        Returns grammar where equivalent non-terminals are merged.
+
+        Non-terminals are equivalent if their sets of rules
+        are equal after every non-terminal is replaced by its
+        class(for example, suffix non-terminals with the same
+        rules added by factorization). Classes are found by
+        partition refinement: at first all non-terminals are
+        in one class, then classes are split by the sets of
+        rules until nothing changes. Every class is replaced
+        by its minimal non-terminal, or by the initial one
+        if it is in the class.
+
+        :return: Grammar
+        """
+        blocks: Dict[NonTerminal, int] = {nterm: 0 for nterm in self.__rules}
+        amount = 1
+        while True:
+            # Non-terminals without rules
+            # are kept distinct by themselves.
+            signatures: Dict[Tuple[int, frozenset], int] = dict()
+            refined: Dict[NonTerminal, int] = dict()
+            for nterm, deriv_set in self.__rules.items():
+                signature = frozenset(
+                    tuple((blocks[symb],) if type(symb) == NonTerminal and symb in blocks else symb
+                          for symb in deriv)
+                    for deriv in deriv_set)
+                # Splitting inside old classes only.
+                key = (blocks[nterm], signature)
+                refined[nterm] = signatures.setdefault(key, len(signatures))
+            blocks = refined
+            if len(signatures) == amount:
+                break
+            amount = len(signatures)
+
+        representatives: Dict[int, NonTerminal] = dict()
+        for nterm, block in blocks.items():
+            if block not in representatives or nterm < representatives[block]:
+                representatives[block] = nterm
+        if self.__inital in blocks:
+            representatives[blocks[self.__inital]] = self.__inital
+
+        g = Grammar(self.__inital)
+        for nterm, deriv in self:
+            if representatives[blocks[nterm]] == nterm:
+                g.add_rule(nterm, tuple(representatives[blocks[symb]]
+                                        if type(symb) == NonTerminal and symb in blocks else symb
+                                        for symb in deriv))
+        return g
+
+    def prepare_for_checking(self, report: 'grammar.PreparationReport' = None,
+                             verbose: bool = True, minimize: bool = False) -> 'Grammar':
         """
         Returns ready for recursive descent parsing.
+        :param report: collects measurements of every stage, if given.
+        :param verbose: print which way of preparation is performed.
+        :param minimize: merge equivalent non-terminals at the end.
         :return: Grammar
         """
+
+        def stage(name, func, *args):
+            if report is None:
+                return func(*args)
+            return report.measure(name, func, *args)
+
         # At first find vanishing non-terminals,
         # and determine is the grammar left-recursive or not.
         g = self
-        vanishing = g._vanishing()
-        if g._has_left_recursion(vanishing):
-            print("Has left-recursion.")
+        vanishing = stage('_vanishing', g._vanishing)
+        if stage('_has_left_recursion', g._has_left_recursion, vanishing):
+            if verbose:
+                print("Has left-recursion.")
 
             # If it left-recursive,
             # vanishing symbols,
@@ -688,10 +791,11 @@ class Grammar:
             # interfere right execution
             # of left-recursion removing.
 
-            g = g._rebuild_vanishing(vanishing) \
-                ._remove_chain_productions() \
-                ._remove_useless() \
-                ._remove_left_recursion()
+            g = stage('_rebuild_vanishing', g._rebuild_vanishing, vanishing)
+            g = stage('_remove_chain_productions', g._remove_chain_productions)
+            g = stage('_remove_dead (before left recursion)', g._remove_dead)
+            g = stage('_remove_unreachable (before left recursion)', g._remove_unreachable)
+            g = stage('_remove_left_recursion', g._remove_left_recursion)
 
             # If there was S -->+ none
             # production(-->+ means "derived by
@@ -706,20 +810,29 @@ class Grammar:
                 g.add_rule(new_start, g.__inital)
                 g.add_rule(new_start, EmptyWord)
                 g.__inital = new_start
+                g.__byte_tables = None
         else:
-            print("Factorization performing.")
+            if verbose:
+                print("Factorization performing.")
             # Don't know why, but can
             # spoil grammar after removing
             # of left-recursion.
-            g = g._factorize()
-        return g._remove_useless()
+            g = stage('_factorize', g._factorize)
+        g = stage('_remove_dead', g._remove_dead)
+        g = stage('_remove_unreachable', g._remove_unreachable)
+        if minimize:
+            g = stage('_merge_equivalent', g._merge_equivalent)
+        return g
 
-    def build_first(self) -> First:
+    def build_first(self, report: 'grammar.PreparationReport' = None) -> First:
         """
         Builds mapping of non-terminal ans symbols of rules to that rules.
 
+        :param report: collects measurements of the building, if given.
         :return: dict
         """
+        if report is not None:
+            return report.measure('build_first', self.build_first)
         d = dict()
         for nterm, deriv in self:
             if len(deriv) > 0 and type(deriv[0]) == NonTerminal:
@@ -738,15 +851,97 @@ class Grammar:
             s.add(deriv)
         return d
 
+    def build_byte_tables(self) -> 'grammar.ByteTables':
+        """
+        Compiles the grammar for checking of bytes-like words.
+
+        Tables are kept until the grammar is changed,
+        so they are compiled once for all checks.
+
+        :return: ByteTables
+        :raises: ValueError if some terminal isn't a byte.
+        """
+        if self.__byte_tables is None:
+            self.__byte_tables = grammar.build_byte_tables(self)
+        return self.__byte_tables
+
+    def build_lookahead(self, k: int = 2) -> 'grammar.Lookahead':
+        """
+        Builds mapping of non-terminal and k next symbols to rules
+        that can start the rest of the word(FIRST_k of FOLLOW_k).
+
+        :param k: length of lookahead.
+        :return: Lookahead
+        """
+        return grammar.build_lookahead(self, k)
+
+    def predictive_parsing(self, word: str, predicted: Derivation, lookahead: 'grammar.Lookahead',
+                           budget: 'grammar.Budget' = None, tracker: 'grammar.FailureTracker' = None) -> bool:
+        """
+        Determines can the word be constructed by the rules of the grammar.
+
+        The same as recursive descent parsing, but only rules consistent
+        with the next k symbols are tried, because the lookahead mapping
+        is complete, brute force is not needed.
+
+        :param word: checked word.
+        :param predicted: prediction word, can consist of non-terminals.
+        :param lookahead: k-lookahead mapping, used for prediction.
+        :param budget: spent on every expansion of non-terminal, if given.
+        :param tracker: collects the furthest failure, if given.
+        :return: bool
+        :raises: BudgetExceeded if the budget is over.
+        """
+        len_word = len(word)
+        len_predict = len(predicted)
+        k = lookahead.k
+
+        if len_predict == 0:
+            if len_word != 0 and tracker is not None:
+                tracker.expect(tracker.length - len_word, ('',))
+            return len_word == 0
+        for i in range(0, len_predict):
+            symb = predicted[i]
+
+            if type(symb) == NonTerminal:
+                if budget is not None:
+                    budget.step()
+                # Only predicted rules can
+                # construct the rest of the word.
+                pair = (symb, word[i:i + k])
+                if tracker is not None and tracker.length - len_word + i + len(pair[1]) >= tracker.position:
+                    # Rules dropped by the lookahead
+                    # are skipped, but they are expected.
+                    tracker.expect_strings(tracker.length - len_word + i, pair[1],
+                                           lookahead.strings(predicted[i:], pair[1]))
+                for derivation in lookahead.get(pair, empty_set):
+                    if self.predictive_parsing(word[i:], derivation + predicted[i + 1:], lookahead, budget,
+                                               tracker):
+                        return True
+                return False
+            else:
+                if i >= len_word or symb != word[i]:
+                    if tracker is not None and tracker.length - len_word + i >= tracker.position:
+                        tracker.expect(tracker.length - len_word + i, (symb,))
+                    return False
+
+        if len_predict != len_word and tracker is not None:
+            tracker.expect(tracker.length - len_word + len_predict, ('',))
+        return len_predict == len_word
+
     def recursive_descent_parsing(self, word: str, predicted: Derivation,
-                                  first: Dict[Tuple[NonTerminal, chr], Set[Derivation]]) -> bool:
+                                  first: Dict[Tuple[NonTerminal, chr], Set[Derivation]],
+                                  budget: 'grammar.Budget' = None, tracker: 'grammar.FailureTracker' = None) -> bool:
         """
         Determines can the word be constructed by the rules of the grammar.
 
         :param word: checked word.
         :param predicted: prediction word, can consist of non-terminals.
         :param first: FIRST dictionary, used for prediction.
+        :param budget: spent on every expansion of non-terminal, if given.
+        :param tracker: collects the furthest failure, if given.
         :return: bool
+        :raises: BudgetExceeded if the budget is over.
         """
         # Pre-computations.
         len_word = len(word)
@@ -759,6 +954,8 @@ class Grammar:
             # if prediction empty and
             #  word not: it's error.
             else:
+                if tracker is not None:
+                    tracker.expect(tracker.length - len_word, ('',))
                 return False
         # For every symbols of predicted
         # word and checked word.
@@ -770,43 +967,113 @@ class Grammar:
             # we should find variant to
             # construct the word.
             if type(symb) == NonTerminal:
+                if budget is not None:
+                    budget.step()
                 # Try to predict rules.
                 pair = (symb, word_first)
                 prediction = empty_set
                 if pair in first:
                     prediction = first[pair]
                     for derivation in prediction:
-                        if self.recursive_descent_parsing(word[i:], derivation + predicted[i + 1:], first):
+                        if self.recursive_descent_parsing(word[i:], derivation + predicted[i + 1:], first, budget,
+                                                          tracker):
                             return True
                 # Brute force.
                 for derivation in self.__rules[symb]:
                     if derivation not in prediction:
-                        if self.recursive_descent_parsing(word[i:], derivation + predicted[i + 1:], first):
+                        if self.recursive_descent_parsing(word[i:], derivation + predicted[i + 1:], first, budget,
+                                                          tracker):
                             return True
                 # If nothing work.
                 return False
             else:
-                if i >= len_word:
-                    return False
-                if symb != word_first:
+                if i >= len_word or symb != word_first:
+                    # Most of failures are behind the furthest one.
+                    if tracker is not None and tracker.length - len_word + i >= tracker.position:
+                        tracker.expect(tracker.length - len_word + i, (symb,))
                     return False
 
         # If after everything
         # len of words not equal.
         if len_predict != len_word:
+            if tracker is not None:
+                tracker.expect(tracker.length - len_word + len_predict, ('',))
             return False
         return True
 
-    def check_word(self, word: str, first: First = None) -> bool:
+    def check_prefix_tree(self, words: List[str], lookahead: 'grammar.Lookahead' = None) -> List[bool]:
+        """
+        Returns are the words contained by the grammar, common prefixes are parsed once.
+
+        :param words: words for check.
+        :param lookahead: 1-lookahead mapping of the grammar.
+        :return: List[bool]
+        """
+        return grammar.check_prefix_tree(self, words, lookahead)
+
+    def check_batch(self, words: List[str], budget: 'grammar.Budget' = None,
+                    lookahead: 'grammar.Lookahead' = None) -> List['grammar.CheckResult']:
+        """
+        Checks many words at once within the budget, see grammar.check_batch.
+        :param words: words for check.
+        :param budget: limit of expansions and time shared by the batch.
+        :param lookahead: 1-lookahead mapping, built if not given.
+        :return: results in order of words.
+        """
+        return grammar.check_batch(self, words, budget, lookahead)
+
+    def check_word(self, word: Union[str, 'grammar.BytesLike'], first: First = None,
+                   budget: 'grammar.Budget' = None, tracker: 'grammar.FailureTracker' = None) -> bool:
         """
         Returns is the grammar contains such word or not.
 
-        :param word: word for check.
+        :param word: word for check, bytes-like words are
+        checked by byte tables without copying.
         :param first: mapping of non-terminal and symbol to that
         non-terminal symbol rules where the symbol occurs at the
         first position. It's predictive element of the algorithm.
+        Lookahead mapping can be used instead, then predictive
+        parsing is performed. ByteTables are used for bytes-like
+        words, the cached ones of the grammar if not given.
+        :param budget: limit of expansions and time, it is not restarted.
+        :param tracker: collects the furthest failure, if given,
+        it must be constructed by the length of the word.
         :return: bool
+        :raises: BudgetExceeded if the budget is over.
         """
+        if isinstance(word, (bytes, bytearray, memoryview)):
+            if not isinstance(first, grammar.ByteTables):
+                first = self.build_byte_tables()
+            return first.check_word(word, budget, tracker)
         if first is None:
             first = self.build_first()
-        return self.recursive_descent_parsing(word, (self.__inital,), first)
+        if isinstance(first, grammar.Lookahead):
+            return self.predictive_parsing(word, (self.__inital,), first, budget, tracker)
+        return self.recursive_descent_parsing(word, (self.__inital,), first, budget, tracker)
+
+    def check(self, word: Union[str, 'grammar.BytesLike'], first: First = None, budget: 'grammar.Budget' = None,
+              diagnose: bool = False) -> 'grammar.CheckResult':
+        """
+        Checks the word within the budget.
+
+        :param word: word for check.
+        :param first: FIRST or lookahead mapping, see check_word.
+        :param budget: limit of expansions and time, it is restarted,
+        unlimited if not given.
+        :param diagnose: collect the furthest failure during the parsing.
+        :return: CheckResult, its verdict is UNKNOWN if the budget is over
+        or the parser ran out of stack, rejected word has failure if diagnose is set.
+        """
+        if budget is None:
+            budget = grammar.Budget()
+        tracker = grammar.FailureTracker(len(word)) if diagnose else None
+        budget.start()
+        try:
+            verdict = grammar.Verdict.ACCEPT if self.check_word(word, first, budget, tracker) else grammar.Verdict.REJECT
+        except (grammar.BudgetExceeded, RecursionError):
+            # Running out of stack is running out of budget too,
+            # the parser just can't go deeper.
+            verdict = grammar.Verdict.UNKNOWN
+        if verdict == grammar.Verdict.REJECT and tracker is not None:
+            return budget.result(verdict, tracker.failure(word))
+        return budget.result(verdict)
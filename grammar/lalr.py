@@ -0,0 +1,330 @@
+__all__ = ['LALRConflict', 'LALRTable', 'build_lalr']
+from typing import Dict, IO, List, NamedTuple, Set, Tuple
+import json
+import grammar
+
+# Item is pair of production index and dot position.
+Item = Tuple[int, int]
+Production = Tuple['grammar.NonTerminal', 'grammar.Derivation']
+
+# End of input, the same as word[len(word):len(word) + 1].
+EndMarker = ''
+# Lookahead placeholder used to find propagated lookaheads.
+_dummy = None
+
+TABLE_VERSION = 2
+
+
+class LALRConflict(NamedTuple):
+    """
+    Conflict of actions in the LALR(1) automaton.
+
+    state       -- state of the automaton;
+    terminal    -- lookahead symbol, '' is end of input;
+    kind        -- 'shift/reduce' or 'reduce/reduce';
+    productions -- indexes of conflicting reduce productions.
+
+    Shift is preferred to reduce, earlier production is
+    preferred to later one.
+    """
+    state: int
+    terminal: str
+    kind: str
+    productions: Tuple[int, ...]
+
+
+class LALRTable:
+    """
+    Tables of LALR(1) automaton and shift-reduce recognizer.
+
+    Action of a state and a terminal is integer:
+    non-negative -- shift to the state,
+    negative     -- reduce by production -action - 1,
+    where reduce by production 0(S' -> S) means acceptance.
+    """
+
+    def __init__(self, productions: List[Production], action: List[Dict[str, int]],
+                 goto: List[Dict['grammar.NonTerminal', int]], conflicts: List[LALRConflict]):
+        """
+        Constructs tables, use build_lalr or load instead.
+        :param productions: productions of augmented grammar.
+        :param action: action table for every state.
+        :param goto: goto table for every state.
+        :param conflicts: found conflicts.
+        """
+        self.productions = productions
+        self.action = action
+        self.goto = goto
+        self.conflicts = conflicts
+        self.__reduces = [(lhs, len(rhs)) for lhs, rhs in productions]
+
+    def is_deterministic(self) -> bool:
+        """
+        Returns has the automaton no conflicts, only then recognizer is exact.
+        :return: bool
+        """
+        return len(self.conflicts) == 0
+
+    def check_word(self, word: str, allow_conflicts: bool = False) -> bool:
+        """
+        Returns is the word accepted by the automaton, takes linear time.
+        :param word: word for check.
+        :param allow_conflicts: check by the automaton with conflicts,
+        then the answer can be wrong(see LALRConflict).
+        :return: bool
+        :raises: ValueError if the automaton has conflicts and they aren't allowed.
+        """
+        if not allow_conflicts and len(self.conflicts) > 0:
+            raise ValueError("LALR automaton has {} conflicts, its answers aren't exact.".format(len(self.conflicts)))
+        action = self.action
+        goto = self.goto
+        reduces = self.__reduces
+        stack = [0]
+        i = 0
+        symb = word[0:1]
+        while True:
+            act = action[stack[-1]].get(symb)
+            if act is None:
+                return False
+            if act >= 0:
+                stack.append(act)
+                i += 1
+                symb = word[i:i + 1]
+            elif act == -1:
+                return True
+            else:
+                lhs, length = reduces[-act - 1]
+                if length > 0:
+                    del stack[-length:]
+                stack.append(goto[stack[-1]][lhs])
+
+    def dump(self, file: IO[bytes]):
+        """
+        Serializes the tables into the binary file as JSON, so loading can't execute code.
+        :param file: opened for binary writing file.
+        :return: none.
+        """
+        data = {
+            "version": TABLE_VERSION,
+            "productions": [[lhs, list(rhs)] for lhs, rhs in self.productions],
+            "action": self.action,
+            "goto": [sorted(row.items()) for row in self.goto],
+            "conflicts": [list(c) for c in self.conflicts],
+        }
+        file.write(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+
+    @staticmethod
+    def load(file: IO[bytes]) -> 'LALRTable':
+        """
+        Loads the tables serialized by dump.
+        :param file: opened for binary reading file.
+        :return: LALRTable
+        :raises: ValueError if the file has another version of tables or isn't tables.
+        """
+        try:
+            data = json.loads(file.read().decode('utf-8'))
+            version = data["version"]
+        except (ValueError, TypeError, KeyError):
+            raise ValueError("File doesn't contain LALR tables.")
+        if version != TABLE_VERSION:
+            raise ValueError("Unsupported version of LALR tables {}.".format(version))
+
+        def check(condition: bool):
+            if not condition:
+                raise ValueError("Malformed LALR tables.")
+
+        try:
+            productions = [(lhs, tuple(rhs)) for lhs, rhs in data["productions"]]
+            action = [{symb: int(act) for symb, act in row.items()} for row in data["action"]]
+            goto = [{nterm: int(state) for nterm, state in row} for row in data["goto"]]
+            conflicts = [LALRConflict(state, terminal, kind, tuple(prods))
+                         for state, terminal, kind, prods in data["conflicts"]]
+        except (ValueError, TypeError, KeyError, AttributeError):
+            raise ValueError("Malformed LALR tables.")
+        for lhs, rhs in productions:
+            check(type(lhs) == grammar.NonTerminal)
+            check(all(type(symb) in (grammar.NonTerminal, str) for symb in rhs))
+        for row in goto:
+            check(all(type(nterm) == grammar.NonTerminal for nterm in row))
+        return LALRTable(productions, action, goto, conflicts)
+
+
+def _first_sets(productions: List[Production]) -> Tuple[Dict['grammar.NonTerminal', Set[str]],
+                                                        Set['grammar.NonTerminal']]:
+    """
+    Determines FIRST sets of terminals and vanishing non-terminals.
+    :param productions: productions of the grammar.
+    :return: FIRST of every non-terminal and set of vanishing ones.
+    """
+    first: Dict[grammar.NonTerminal, Set[str]] = dict()
+    vanishing: Set[grammar.NonTerminal] = set()
+    for lhs, _ in productions:
+        first[lhs] = set()
+
+    changes = True
+    while changes:
+        changes = False
+        for lhs, rhs in productions:
+            before = len(first[lhs])
+            nullable = True
+            for symb in rhs:
+                if type(symb) == grammar.NonTerminal:
+                    first[lhs] |= first.get(symb, grammar.grammar.empty_set)
+                    if symb not in vanishing:
+                        nullable = False
+                        break
+                else:
+                    first[lhs].add(symb)
+                    nullable = False
+                    break
+            if nullable and lhs not in vanishing:
+                vanishing.add(lhs)
+                changes = True
+            if before != len(first[lhs]):
+                changes = True
+    return first, vanishing
+
+
+def build_lalr(g: 'grammar.Grammar') -> LALRTable:
+    """
+    Builds LALR(1) automaton of the grammar.
+
+    The grammar isn't required to be prepared, left-recursion
+    is handled by the automaton itself.
+
+    Lookaheads are found by propagation from kernel items
+    (the algorithm of "Compilers: Principles, Techniques, and Tools").
+
+    :param g: Grammar.
+    :return: LALRTable
+    """
+    # Augmented grammar: production 0 is S' -> S.
+    start = g.max_nterm() + 1
+    productions: List[Production] = [(start, (g.initial(),))]
+    for nterm, deriv in g:
+        productions.append((nterm, deriv))
+    by_lhs: Dict[grammar.NonTerminal, List[int]] = dict()
+    for p, (lhs, _) in enumerate(productions):
+        by_lhs.setdefault(lhs, list()).append(p)
+
+    first, vanishing = _first_sets(productions)
+
+    def first_of(seq: grammar.Derivation, lookahead) -> Set:
+        result = set()
+        for symb in seq:
+            if type(symb) == grammar.NonTerminal:
+                result |= first.get(symb, grammar.grammar.empty_set)
+                if symb not in vanishing:
+                    return result
+            else:
+                result.add(symb)
+                return result
+        result.add(lookahead)
+        return result
+
+    def closure0(kernel) -> Set[Item]:
+        items = set(kernel)
+        queue = list(kernel)
+        while len(queue) > 0:
+            p, dot = queue.pop()
+            rhs = productions[p][1]
+            if dot < len(rhs) and type(rhs[dot]) == grammar.NonTerminal:
+                for q in by_lhs.get(rhs[dot], ()):
+                    if (q, 0) not in items:
+                        items.add((q, 0))
+                        queue.append((q, 0))
+        return items
+
+    def closure1(items: Dict[Item, Set]) -> Dict[Item, Set]:
+        result = {item: set(las) for item, las in items.items()}
+        queue = [(item, la) for item, las in items.items() for la in las]
+        while len(queue) > 0:
+            (p, dot), la = queue.pop()
+            rhs = productions[p][1]
+            if dot < len(rhs) and type(rhs[dot]) == grammar.NonTerminal:
+                lookaheads = first_of(rhs[dot + 1:], la)
+                for q in by_lhs.get(rhs[dot], ()):
+                    las = result.setdefault((q, 0), set())
+                    for b in lookaheads:
+                        if b not in las:
+                            las.add(b)
+                            queue.append(((q, 0), b))
+        return result
+
+    # LR(0) automaton.
+    kernels: List[frozenset] = [frozenset({(0, 0)})]
+    index: Dict[frozenset, int] = {kernels[0]: 0}
+    transitions: Dict[Tuple[int, object], int] = dict()
+    i = 0
+    while i < len(kernels):
+        moves: Dict[object, Set[Item]] = dict()
+        for p, dot in closure0(kernels[i]):
+            rhs = productions[p][1]
+            if dot < len(rhs):
+                moves.setdefault(rhs[dot], set()).add((p, dot + 1))
+        for symb, kernel in moves.items():
+            kernel = frozenset(kernel)
+            if kernel not in index:
+                index[kernel] = len(kernels)
+                kernels.append(kernel)
+            transitions[(i, symb)] = index[kernel]
+        i += 1
+
+    # Spontaneous and propagated lookaheads of kernel items.
+    lookaheads: List[Dict[Item, Set]] = [{item: set() for item in kernel} for kernel in kernels]
+    lookaheads[0][(0, 0)].add(EndMarker)
+    propagation: Dict[Tuple[int, Item], List[Tuple[int, Item]]] = dict()
+    for state, kernel in enumerate(kernels):
+        for k_item in kernel:
+            for (p, dot), las in closure1({k_item: {_dummy}}).items():
+                rhs = productions[p][1]
+                if dot == len(rhs):
+                    continue
+                target = (transitions[(state, rhs[dot])], (p, dot + 1))
+                for la in las:
+                    if la is _dummy:
+                        propagation.setdefault((state, k_item), list()).append(target)
+                    else:
+                        lookaheads[target[0]][target[1]].add(la)
+
+    queue = [(state, item) for state, kernel in enumerate(kernels) for item in kernel]
+    while len(queue) > 0:
+        state, item = queue.pop()
+        source = lookaheads[state][item]
+        for t_state, t_item in propagation.get((state, item), ()):
+            target = lookaheads[t_state][t_item]
+            if not source <= target:
+                target |= source
+                queue.append((t_state, t_item))
+
+    # Tables.
+    action: List[Dict[str, int]] = list()
+    goto: List[Dict[grammar.NonTerminal, int]] = list()
+    conflicts: List[LALRConflict] = list()
+    for state in range(len(kernels)):
+        acts: Dict[str, int] = dict()
+        gotos: Dict[grammar.NonTerminal, int] = dict()
+        reduces: Dict[str, List[int]] = dict()
+        for (p, dot), las in closure1(lookaheads[state]).items():
+            rhs = productions[p][1]
+            if dot < len(rhs):
+                symb = rhs[dot]
+                if type(symb) == grammar.NonTerminal:
+                    gotos[symb] = transitions[(state, symb)]
+                else:
+                    acts[symb] = transitions[(state, symb)]
+            else:
+                for la in las:
+                    reduces.setdefault(la, list()).append(p)
+        for la, prods in reduces.items():
+            prods.sort()
+            if la in acts:
+                conflicts.append(LALRConflict(state, la, 'shift/reduce', tuple(prods)))
+                continue
+            if len(prods) > 1:
+                conflicts.append(LALRConflict(state, la, 'reduce/reduce', tuple(prods)))
+            acts[la] = -prods[0] - 1
+        action.append(acts)
+        goto.append(gotos)
+
+    return LALRTable(productions, action, goto, conflicts)
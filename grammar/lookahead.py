@@ -0,0 +1,204 @@
+__all__ = ['Lookahead', 'build_first_k', 'build_follow_k', 'build_lookahead']
+from typing import Dict, Set, Tuple
+import grammar
+
+Strings = Set[str]
+
+
+class Lookahead(dict):
+    """
+    Mapping of non-terminal and k-lookahead to rules of the non-terminal.
+
+    Key is pair of non-terminal and the next k symbols of the input
+    (less than k only if the input ends), value is set of derivations
+    which can start the rest of the word. Unlike FIRST mapping,
+    it is complete: derivations that aren't present under the key
+    can't construct the word.
+    """
+
+    def __init__(self, k: int, first_k: Dict['grammar.NonTerminal', Strings] = None):
+        """
+        Constructs empty mapping.
+        :param k: length of lookahead.
+        :param first_k: FIRST_k of non-terminals, used for diagnostics.
+        """
+        super().__init__()
+        self.k = k
+        self.first_k = first_k if first_k is not None else dict()
+        self.__cuts: Dict[tuple, Tuple[Strings, Strings]] = dict()
+
+    def __tails(self, symb, found: str, start: int) -> Tuple[Strings, Strings]:
+        """
+        Returns strings of the symbol which can follow found[:start], cut as in strings.
+        :param symb: symbol of the prediction.
+        :param found: next at most k symbols of the word.
+        :param start: amount of the found symbols before the symbol.
+        :return: tails which match the found symbols and the cut ones.
+        """
+        key = (symb, found, start)
+        if key not in self.__cuts:
+            if type(symb) == grammar.NonTerminal:
+                tails = self.first_k.get(symb, grammar.grammar.empty_set)
+            else:
+                tails = (symb,)
+            matched: Strings = set()
+            cut: Strings = set()
+            for b in tails:
+                b = b[:self.k - start]
+                common = 0
+                while common < len(b) and start + common < len(found) and b[common] == found[start + common]:
+                    common += 1
+                if common < len(b):
+                    cut.add(b[:common + 1])
+                else:
+                    matched.add(b)
+            self.__cuts[key] = (matched, cut)
+        return self.__cuts[key]
+
+    def strings(self, predicted: 'grammar.Derivation', found: str) -> Strings:
+        """
+        Returns k-lookahead strings of the prediction, used for diagnostics.
+
+        Unlike keys of the mapping, they are built from the actual
+        rest of the prediction rather than FOLLOW_k, so they expect
+        the same symbols as parsing by brute force. Strings are cut
+        after the first symbol differing from the found ones, so only
+        few of them are built.
+
+        :param predicted: the whole prediction word.
+        :param found: next at most k symbols of the word.
+        :return: set of strings, shorter than k ones which aren't cut end the word.
+        """
+        result = {''}
+        strings = set()
+        for symb in predicted:
+            extended = set()
+            for a in result:
+                matched, cut = self.__tails(symb, found, len(a))
+                strings.update(a + b for b in cut)
+                for b in matched:
+                    if len(a) + len(b) >= self.k:
+                        strings.add(a + b)
+                    else:
+                        extended.add(a + b)
+            result = extended
+            if len(result) == 0:
+                break
+        return result | strings
+
+
+def concat_k(left: Strings, right: Strings, k: int) -> Strings:
+    """
+    Returns all concatenations of strings truncated to k symbols.
+    :param left: set of strings.
+    :param right: set of strings.
+    :param k: maximal length.
+    :return: set of strings.
+    """
+    result = set()
+    for a in left:
+        if len(a) >= k:
+            result.add(a)
+            continue
+        for b in right:
+            result.add((a + b)[:k])
+    return result
+
+
+def first_k_of(deriv: 'grammar.Derivation', first_k: Dict['grammar.NonTerminal', Strings], k: int) -> Strings:
+    """
+    Returns FIRST_k of the sequence of symbols.
+    :param deriv: sequence of symbols.
+    :param first_k: FIRST_k of non-terminals.
+    :param k: length of lookahead.
+    :return: set of strings.
+    """
+    result = {''}
+    for symb in deriv:
+        if type(symb) == grammar.NonTerminal:
+            result = concat_k(result, first_k.get(symb, grammar.grammar.empty_set), k)
+        else:
+            result = concat_k(result, {symb}, k)
+        if len(result) == 0 or min(map(len, result)) >= k:
+            break
+    return result
+
+
+def build_first_k(g: 'grammar.Grammar', k: int) -> Dict['grammar.NonTerminal', Strings]:
+    """
+    Determines FIRST_k sets of non-terminals.
+
+    FIRST_k of a non-terminal is set of the first k symbols
+    of words which can be derived from it(or whole words if
+    they are shorter).
+
+    :param g: Grammar.
+    :param k: length of lookahead.
+    :return: dict
+    """
+    first_k: Dict[grammar.NonTerminal, Strings] = {nterm: set() for nterm in g.nterms()}
+    changes = True
+    while changes:
+        changes = False
+        for nterm, deriv in g:
+            strings = first_k_of(deriv, first_k, k)
+            if not strings <= first_k[nterm]:
+                first_k[nterm] |= strings
+                changes = True
+    return first_k
+
+
+def build_follow_k(g: 'grammar.Grammar', k: int,
+                   first_k: Dict['grammar.NonTerminal', Strings]) -> Dict['grammar.NonTerminal', Strings]:
+    """
+    Determines FOLLOW_k sets of non-terminals.
+
+    FOLLOW_k of a non-terminal is set of the first k symbols
+    which can follow it in sentential forms, string is shorter
+    than k only if the word ends after it.
+
+    :param g: Grammar.
+    :param k: length of lookahead.
+    :param first_k: FIRST_k of non-terminals.
+    :return: dict
+    """
+    follow_k: Dict[grammar.NonTerminal, Strings] = {nterm: set() for nterm in g.nterms()}
+    follow_k.setdefault(g.initial(), set()).add('')
+    changes = True
+    while changes:
+        changes = False
+        for nterm, deriv in g:
+            for i, symb in enumerate(deriv):
+                if type(symb) != grammar.NonTerminal:
+                    continue
+                strings = concat_k(first_k_of(deriv[i + 1:], first_k, k), follow_k.get(nterm, set()), k)
+                target = follow_k.setdefault(symb, set())
+                if not strings <= target:
+                    target |= strings
+                    changes = True
+    return follow_k
+
+
+def build_lookahead(g: 'grammar.Grammar', k: int) -> Lookahead:
+    """
+    Builds k-lookahead mapping of the grammar.
+
+    Rule A --> alpha is predicted by every string of
+    FIRST_k(alpha FOLLOW_k(A)).
+
+    :param g: Grammar.
+    :param k: length of lookahead, at least 1.
+    :return: Lookahead
+    """
+    if k < 1:
+        raise ValueError("Length of lookahead must be positive.")
+    first_k = build_first_k(g, k)
+    follow_k = build_follow_k(g, k, first_k)
+    table = Lookahead(k, first_k)
+    for nterm, deriv in g:
+        for s in concat_k(first_k_of(deriv, first_k, k), follow_k.get(nterm, grammar.grammar.empty_set), k):
+            t = (nterm, s)
+            if t not in table:
+                table[t] = set()
+            table[t].add(deriv)
+    return table
@@ -0,0 +1,253 @@
+__all__ = ['fingerprint', 'estimate_size', 'PreparedGrammar', 'GrammarRegistry']
+from typing import Any, Callable, Dict, NamedTuple, Tuple
+from collections import OrderedDict
+import hashlib
+import sys
+import threading
+import grammar
+
+
+def _digest(*parts: str) -> str:
+    """
+    Hashes the sequence of strings.
+    :param parts: strings.
+    :return: hex string.
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode('utf-8', 'surrogatepass'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def fingerprint(g: 'grammar.Grammar') -> str:
+    """
+    Returns canonical fingerprint of the grammar.
+
+    The fingerprint doesn't depend on numbering of non-terminals:
+    every non-terminal is coloured by its rules, where non-terminals
+    are replaced by their colours, and colours are refined until
+    amount of different colours stops growing(like Weisfeiler-Lehman
+    refinement of graphs). Grammars that differ only by numbering
+    have equal fingerprints.
+
+    :param g: Grammar.
+    :return: hex string.
+    """
+    initial = g.initial()
+    nterms = set(g.nterms())
+    nterms.add(initial)
+    for _, deriv in g:
+        for symb in deriv:
+            if type(symb) == grammar.NonTerminal:
+                nterms.add(symb)
+
+    colors: Dict[grammar.NonTerminal, str] = {n: '' for n in nterms}
+    classes = 1
+    while True:
+        new_colors: Dict[grammar.NonTerminal, str] = dict()
+        for nterm in nterms:
+            encoded = list()
+            for deriv in g.rules(nterm):
+                encoded.append(' '.join('n' + colors[s] if type(s) == grammar.NonTerminal else 't' + repr(s)
+                                        for s in deriv))
+            encoded.sort()
+            new_colors[nterm] = _digest('S' if nterm == initial else 'N', colors[nterm], *encoded)
+        new_classes = len(set(new_colors.values()))
+        colors = new_colors
+        if new_classes == classes:
+            break
+        classes = new_classes
+
+    return _digest(colors[initial], *sorted(colors.values()))
+
+
+def estimate_size(obj: Any) -> int:
+    """
+    Returns approximate amount of memory used by the object and everything it refers to.
+
+    Shared objects are counted once.
+
+    :param obj: built-in container, scalar or object with __dict__.
+    :return: bytes.
+    """
+    seen = set()
+    stack = [obj]
+    size = 0
+    while len(stack) > 0:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        elif hasattr(o, '__dict__'):
+            stack.append(vars(o))
+    return size
+
+
+class PreparedGrammar(NamedTuple):
+    """
+    Prepared grammar kept by the registry.
+
+    fingerprint -- fingerprint of the source grammar;
+    grammar     -- prepared grammar;
+    tables      -- parsing tables of the prepared grammar(FIRST by default);
+    size        -- estimated size of the entry in bytes.
+    """
+    fingerprint: str
+    grammar: 'grammar.Grammar'
+    tables: Any
+    size: int
+
+
+def _default_prepare(g: 'grammar.Grammar') -> Tuple['grammar.Grammar', Any]:
+    """
+    Prepares the grammar for recursive descent parsing and builds its FIRST.
+    :param g: source grammar, can be spoiled.
+    :return: prepared grammar and FIRST mapping.
+    """
+    prepared = g.prepare_for_checking(verbose=False)
+    return prepared, prepared.build_first()
+
+
+class _Pending:
+    """
+    Computation of the entry that is in progress.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.entry: PreparedGrammar = None
+        self.error: BaseException = None
+
+
+class GrammarRegistry:
+    """
+    Thread-safe LRU registry of prepared grammars.
+
+    Entries are keyed by fingerprints of source grammars and
+    evicted in least recently used order when their summary size
+    exceeds the memory budget. Every entry is prepared once even
+    if many threads request it at the same moment.
+    """
+
+    def __init__(self, memory_budget: int = 64 * 1024 * 1024,
+                 prepare: Callable[['grammar.Grammar'], Tuple['grammar.Grammar', Any]] = None):
+        """
+        Constructs new empty registry.
+        :param memory_budget: maximal summary size of entries in bytes.
+        :param prepare: function building prepared grammar and its tables
+        from source grammar, prepare_for_checking and build_first by default.
+        """
+        if prepare is None:
+            prepare = _default_prepare
+        self.memory_budget = memory_budget
+        self.__prepare = prepare
+        self.__entries: 'OrderedDict[str, PreparedGrammar]' = OrderedDict()
+        self.__pending: Dict[str, _Pending] = dict()
+        self.__usage = 0
+        self.__lock = threading.Lock()
+
+    def get(self, g: 'grammar.Grammar') -> PreparedGrammar:
+        """
+        Returns prepared grammar, preparing it if it is not present.
+        :param g: source grammar.
+        :return: PreparedGrammar
+        :raises: whatever preparation raises.
+        """
+        key = fingerprint(g)
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                self.__entries.move_to_end(key)
+                return entry
+            pending = self.__pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = _Pending()
+                self.__pending[key] = pending
+
+        if not owner:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.entry
+
+        try:
+            prepared, tables = self.__prepare(g.copy())
+            entry = PreparedGrammar(key, prepared, tables, estimate_size((prepared, tables)))
+            pending.entry = entry
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            with self.__lock:
+                del self.__pending[key]
+                if pending.error is None:
+                    self.__store(entry)
+            pending.done.set()
+        return entry
+
+    def __store(self, entry: PreparedGrammar):
+        """
+        Stores the entry and evicts old ones, must be called under the lock.
+        :param entry: new entry.
+        :return: none.
+        """
+        if entry.size > self.memory_budget:
+            return
+        self.__entries[entry.fingerprint] = entry
+        self.__usage += entry.size
+        while self.__usage > self.memory_budget:
+            _, old = self.__entries.popitem(last=False)
+            self.__usage -= old.size
+
+    def discard(self, g: 'grammar.Grammar'):
+        """
+        Removes entry of the grammar if it is present.
+        :param g: source grammar.
+        :return: none.
+        """
+        key = fingerprint(g)
+        with self.__lock:
+            entry = self.__entries.pop(key, None)
+            if entry is not None:
+                self.__usage -= entry.size
+
+    def clear(self):
+        """
+        Removes all entries.
+        :return: none.
+        """
+        with self.__lock:
+            self.__entries.clear()
+            self.__usage = 0
+
+    def memory_usage(self) -> int:
+        """
+        Returns summary estimated size of entries.
+        :return: bytes.
+        """
+        return self.__usage
+
+    def __contains__(self, g: 'grammar.Grammar') -> bool:
+        """
+        Checks is prepared version of the grammar present.
+        :param g: source grammar.
+        :return: bool
+        """
+        key = fingerprint(g)
+        with self.__lock:
+            return key in self.__entries
+
+    def __len__(self) -> int:
+        """
+        Returns amount of entries.
+        :return: int
+        """
+        return len(self.__entries)
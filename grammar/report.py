@@ -0,0 +1,131 @@
+__all__ = ['StageRecord', 'PreparationReport']
+from typing import Callable, ContextManager, List, NamedTuple, Optional
+import contextlib
+import time
+import tracemalloc
+import grammar
+
+
+class StageRecord(NamedTuple):
+    """
+    Measurements of one transformation stage.
+
+    name        -- name of the stage(method name);
+    seconds     -- wall time of the stage;
+    peak_memory -- peak of allocated memory during the stage in bytes,
+                   None if memory wasn't traced;
+    rules       -- amount of rules after the stage;
+    nterms      -- amount of non-terminals after the stage.
+    """
+    name: str
+    seconds: float
+    peak_memory: Optional[int]
+    rules: int
+    nterms: int
+
+
+class PreparationReport:
+    """
+    Collects per-stage measurements of grammar preparation.
+
+    Pass an instance to Grammar.prepare_for_checking or
+    Grammar.build_first and every executed stage will be
+    recorded in the order of execution.
+    """
+
+    def __init__(self, hook: Callable[[str], ContextManager] = None, trace_memory: bool = True):
+        """
+        Constructs new empty report.
+        :param hook: factory of context managers, it is called with the stage name
+        and the returned context manager wraps the stage(for external profilers).
+        :param trace_memory: measure peak memory by tracemalloc, slows stages down.
+        """
+        self.hook = hook
+        self.trace_memory = trace_memory
+        self.records: List[StageRecord] = list()
+
+    def measure(self, name: str, func: Callable, *args):
+        """
+        Executes the stage and records its measurements.
+
+        Sizes are taken from the result if it is a Grammar,
+        otherwise from the grammar the method is bound to.
+        The stage is recorded even if it raises, and memory
+        tracing started here is always stopped.
+
+        :param name: name of the stage.
+        :param func: stage itself.
+        :param args: arguments of the stage.
+        :return: result of the stage.
+        """
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+
+        result = None
+        start = None
+        seconds = None
+        try:
+            wrapper = self.hook(name) if self.hook is not None else contextlib.nullcontext()
+            with wrapper:
+                start = time.perf_counter()
+                result = func(*args)
+                seconds = time.perf_counter() - start
+        finally:
+            if seconds is None:
+                # The stage or the hook raised.
+                seconds = 0.0 if start is None else time.perf_counter() - start
+            peak = None
+            if self.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                peak -= baseline
+                if started_tracing:
+                    tracemalloc.stop()
+
+            subject = result if isinstance(result, grammar.Grammar) else getattr(func, '__self__', None)
+            if isinstance(subject, grammar.Grammar):
+                rules, nterms = subject.rules_count(), subject.nterms_count()
+            else:
+                rules, nterms = 0, 0
+            self.records.append(StageRecord(name, seconds, peak, rules, nterms))
+        return result
+
+    def total_seconds(self) -> float:
+        """
+        Returns summary wall time of all recorded stages.
+        :return: float
+        """
+        return sum(r.seconds for r in self.records)
+
+    def slowest(self) -> Optional[StageRecord]:
+        """
+        Returns the stage with the biggest wall time.
+        :return: StageRecord or None if nothing was recorded.
+        """
+        if len(self.records) == 0:
+            return None
+        return max(self.records, key=lambda r: r.seconds)
+
+    def __iter__(self):
+        """
+        Iterator through the records.
+        :return: iterator
+        """
+        return iter(self.records)
+
+    def __str__(self):
+        """
+        String representation of the report as a table.
+        :return: str
+        """
+        width = max([28] + [len(r.name) for r in self.records])
+        ret = "{:{}} {:>10} {:>12} {:>8} {:>8}\n".format("stage", width, "seconds", "peak bytes", "rules", "nterms")
+        for r in self.records:
+            peak = "-" if r.peak_memory is None else r.peak_memory
+            ret += "{:{}} {:>10.4f} {:>12} {:>8} {:>8}\n".format(r.name, width, r.seconds, peak, r.rules, r.nterms)
+        ret += "{:{}} {:>10.4f}\n".format("total", width, self.total_seconds())
+        return ret
@@ -0,0 +1,282 @@
+__all__ = ['Span', 'all_spans', 'find_spans']
+from typing import Dict, IO, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+import grammar
+
+# Earley item: non-terminal, its rule, position of the dot
+# in the rule and position where recognition of the rule started.
+Item = Tuple['grammar.NonTerminal', 'grammar.Derivation', int, int]
+# The smallest and the biggest positions where matches
+# containing the item can start.
+Roots = Tuple[int, int]
+
+CHUNK_SIZE = 1 << 16
+
+
+class Span(NamedTuple):
+    """
+    Substring text[start:end] derived from the non-terminal.
+    """
+    start: int
+    end: int
+
+
+def _chars(text: Union[str, IO]) -> Iterator[str]:
+    """
+    Iterates through symbols of the text.
+    :param text: str or text file, the file is read by chunks.
+    :return: iterator of symbols.
+    """
+    if isinstance(text, str):
+        yield from text
+        return
+    while True:
+        chunk = text.read(CHUNK_SIZE)
+        if len(chunk) == 0:
+            return
+        yield from chunk
+
+
+class _Scanner:
+    """
+    Earley recognizer which starts recognition of the non-terminal at every position.
+
+    Only the current item set and sets where recognition
+    of its items started are kept. Vanishing non-terminals
+    are skipped on prediction(Aycock and Horspool), so items
+    are never completed at the position where they started.
+    """
+
+    def __init__(self, rules: Dict['grammar.NonTerminal', List['grammar.Derivation']],
+                 vanishing: Set['grammar.NonTerminal'], target: 'grammar.NonTerminal',
+                 max_span: Optional[int], start: int):
+        """
+        Constructs the scanner standing at the position.
+        :param rules: rules of the grammar.
+        :param vanishing: vanishing non-terminals of the grammar.
+        :param target: searched non-terminal.
+        :param max_span: maximal length of matches, unlimited if None.
+        :param start: position of the first symbol which will be fed.
+        """
+        self.rules = rules
+        self.vanishing = vanishing
+        self.target = target
+        self.max_span = max_span
+        self.position = start
+        # Item sets by positions and items waiting
+        # for non-terminals in them.
+        self.sets: Dict[int, Dict[Item, Roots]] = dict()
+        self.waiting: Dict[int, Dict[grammar.NonTerminal, List[Item]]] = dict()
+        # Start positions of matches ending at the current position.
+        self.matches: List[int] = list()
+        self.__close(dict())
+
+    def __close(self, scanned: Dict[Item, Roots]):
+        """
+        Builds item set of the current position from scanned items.
+        :param scanned: items moved over the current symbol.
+        :return: none.
+        """
+        k = self.position
+        current: Dict[Item, Roots] = dict()
+        waiting: Dict[grammar.NonTerminal, List[Item]] = dict()
+        self.sets[k] = current
+        self.waiting[k] = waiting
+        matches: Set[int] = set()
+        queue: List[Item] = list()
+
+        def add(item: Item, roots: Roots):
+            old = current.get(item)
+            if old is not None:
+                roots = (min(old[0], roots[0]), max(old[1], roots[1]))
+                if roots == old:
+                    return
+            elif item[2] < len(item[1]) and type(item[1][item[2]]) == grammar.NonTerminal:
+                waiting.setdefault(item[1][item[2]], list()).append(item)
+            current[item] = roots
+            queue.append(item)
+
+        for item, roots in scanned.items():
+            add(item, roots)
+        # Recognition of the non-terminal
+        # starts at every position.
+        for deriv in self.rules.get(self.target, grammar.grammar.empty_set):
+            add((self.target, deriv, 0, k), (k, k))
+
+        while len(queue) > 0:
+            item = queue.pop()
+            nterm, deriv, dot, origin = item
+            roots = current[item]
+            if dot < len(deriv):
+                symb = deriv[dot]
+                if type(symb) == grammar.NonTerminal:
+                    for predicted in self.rules.get(symb, grammar.grammar.empty_set):
+                        add((symb, predicted, 0, k), roots)
+                    if symb in self.vanishing:
+                        add((nterm, deriv, dot + 1, origin), roots)
+            elif origin < k:
+                if nterm == self.target:
+                    matches.add(origin)
+                # Sets of previous positions are finished,
+                # so roots of waiting items are final.
+                previous = self.sets[origin]
+                for waiter in self.waiting[origin].get(nterm, ()):
+                    add((waiter[0], waiter[1], waiter[2] + 1, waiter[3]), previous[waiter])
+
+        self.matches = sorted(o for o in matches if self.max_span is None or k - o <= self.max_span)
+
+    def feed(self, symb: str):
+        """
+        Moves the scanner over the symbol.
+        :param symb: next symbol of the text.
+        :return: none.
+        """
+        k = self.position
+        low = None if self.max_span is None else k + 1 - self.max_span
+        scanned: Dict[Item, Roots] = dict()
+        for item, roots in self.sets[k].items():
+            nterm, deriv, dot, origin = item
+            if dot < len(deriv) and deriv[dot] == symb and (low is None or roots[1] >= low):
+                scanned[(nterm, deriv, dot + 1, origin)] = roots
+        self.position = k + 1
+        self.__close(scanned)
+
+        # Only sets where alive items started are needed
+        # further, and sets where their waiters started.
+        alive = {self.position}
+        queue = [self.position]
+        while len(queue) > 0:
+            for item in self.sets[queue.pop()]:
+                if item[3] not in alive:
+                    alive.add(item[3])
+                    queue.append(item[3])
+        for position in list(self.sets.keys()):
+            if position not in alive and position != self.position:
+                del self.sets[position]
+                del self.waiting[position]
+
+    def live_start(self) -> int:
+        """
+        Returns the smallest position where matches not found yet can start.
+        :return: int, the current position if only new matches can be found.
+        """
+        start = self.position
+        for (_, deriv, dot, _), roots in self.sets[self.position].items():
+            if roots[0] < start and dot < len(deriv) and type(deriv[dot]) != grammar.NonTerminal:
+                start = roots[0]
+        if self.max_span is not None:
+            start = max(start, self.position - self.max_span)
+        return start
+
+    def is_final(self, start: int) -> bool:
+        """
+        Determines that matches starting at the position or before can't be found further.
+        :param start: the position.
+        :return: bool
+        """
+        if self.max_span is not None and self.position - start >= self.max_span:
+            return True
+        # Only items waiting for terminals can be moved further,
+        # the others are moved through them.
+        for (_, deriv, dot, _), roots in self.sets[self.position].items():
+            if roots[0] <= start and dot < len(deriv) and type(deriv[dot]) != grammar.NonTerminal:
+                return False
+        return True
+
+
+def _tables(g: 'grammar.Grammar', nterm: Optional['grammar.NonTerminal']) -> tuple:
+    """
+    Returns arguments of the scanner for the grammar.
+    :param g: Grammar.
+    :param nterm: searched non-terminal, the initial one if None.
+    :return: rules, vanishing non-terminals and searched non-terminal.
+    """
+    rules = {n: list(g.rules(n)) for n in g.nterms()}
+    return rules, g._vanishing(), g.initial() if nterm is None else nterm
+
+
+def all_spans(g: 'grammar.Grammar', text: Union[str, IO], nterm: 'grammar.NonTerminal' = None,
+              max_span: int = None) -> Iterator[Span]:
+    """
+    Finds all non-empty substrings derived from the non-terminal.
+
+    Chart parsing(Earley) starts recognition at every position,
+    so work is shared by all start positions, and every position
+    is visited once, the text can be bigger than memory.
+    The grammar can be any, it isn't needed to prepare it.
+
+    :param g: Grammar.
+    :param text: str or text file.
+    :param nterm: searched non-terminal, the initial one if None.
+    :param max_span: maximal length of matches, unlimited if None.
+    :return: spans ordered by end and then by start.
+    """
+    scanner = _Scanner(*_tables(g, nterm), max_span, 0)
+    for symb in _chars(text):
+        scanner.feed(symb)
+        for start in scanner.matches:
+            yield Span(start, scanner.position)
+
+
+def find_spans(g: 'grammar.Grammar', text: Union[str, IO], nterm: 'grammar.NonTerminal' = None,
+               max_span: int = None) -> Iterator[Span]:
+    """
+    Finds leftmost-longest non-overlapping non-empty substrings derived from the non-terminal.
+
+    Every item of the chart knows the smallest position where
+    the match containing it can start, so the leftmost match is
+    reported as soon as no item can start match before it or
+    extend it. Then the scanner is restarted after the match over
+    the buffered text. Only the text since the start of the leftmost
+    unfinished match is buffered.
+
+    :param g: Grammar.
+    :param text: str or text file.
+    :param nterm: searched non-terminal, the initial one if None.
+    :param max_span: maximal length of matches, unlimited if None.
+    :return: spans ordered by start.
+    """
+    tables = _tables(g, nterm)
+    # Position of the first buffered symbol.
+    position = 0
+    buffer: List[str] = list()
+    scanner = _Scanner(*tables, max_span, position)
+    # The longest match of every start position.
+    longest: Dict[int, int] = dict()
+    symbols = _chars(text)
+    while True:
+        symb = next(symbols, None)
+        if symb is not None:
+            buffer.append(symb)
+            scanner.feed(symb)
+            for start in scanner.matches:
+                longest[start] = scanner.position
+
+        while len(longest) > 0:
+            start = min(longest)
+            if symb is not None and not scanner.is_final(start):
+                break
+            end = longest[start]
+            yield Span(start, end)
+
+            # Matches mustn't overlap,
+            # so search restarts after the match.
+            del buffer[:end - position]
+            position = end
+            scanner = _Scanner(*tables, max_span, position)
+            longest.clear()
+            for rest in buffer:
+                scanner.feed(rest)
+                for s in scanner.matches:
+                    longest[s] = scanner.position
+        if symb is None:
+            break
+
+        # Restart is possible only at the end of
+        # a match, so the text before all matches
+        # which aren't reported yet isn't needed.
+        keep = scanner.live_start()
+        if len(longest) > 0:
+            keep = min(keep, min(longest))
+        if keep > position:
+            del buffer[:keep - position]
+            position = keep
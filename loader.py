@@ -9,7 +9,7 @@ class ParsingError(Exception):
     pass
 
 
-def parse_grammar(file: IO) -> grammar.Grammar:
+def parse_grammar(file: IO, binary: bool = False) -> grammar.Grammar:
     g = grammar.Grammar()
     str_nterm_map: Dict[str, int] = dict()
     nterm_seq = itertools.count(0)
@@ -23,6 +23,9 @@ def parse_grammar(file: IO) -> grammar.Grammar:
             return nterm
 
     for line in file.readlines():
+        if isinstance(line, bytes):
+            # Every byte of binary file is a character 0-255.
+            line = line.decode('latin-1')
         pieces = line.replace('\n', '').split("::=")
         if len(pieces) != 2:
             raise ParsingError("Production must be of the form of ntem::=rule|...|rule.")
@@ -38,7 +41,17 @@ def parse_grammar(file: IO) -> grammar.Grammar:
             nterm_flag = False
             nbody = ""
             escaped = False
+            hex_code = None
             for symb in rule:
+                if hex_code is not None:
+                    # Binary grammars can describe any byte by \xHH.
+                    if symb not in "0123456789abcdefABCDEF":
+                        raise ParsingError("\\x must be followed by two hexadecimal digits.")
+                    hex_code += symb
+                    if len(hex_code) == 2:
+                        derivation += (chr(int(hex_code, 16)),)
+                        hex_code = None
+                    continue
                 if nterm_flag:
                     if symb == '<':
                         raise ParsingError
@@ -50,6 +63,10 @@ def parse_grammar(file: IO) -> grammar.Grammar:
                         nbody += symb
                 else:
                     if escaped:
+                        if binary and symb == 'x':
+                            hex_code = ""
+                            escaped = False
+                            continue
                         if symb not in {'<', '>', '|', '\\'}:
                             raise ParsingError("Only '<', '>', '|', '\\' can be escaped.")
                         derivation += (symb,)
@@ -62,9 +79,11 @@ def parse_grammar(file: IO) -> grammar.Grammar:
                     elif symb == '\\':
                         escaped = True
                     else:
+                        if binary and ord(symb) > 0xff:
+                            raise ParsingError("Terminal {!r} of binary grammar isn't a byte.".format(symb))
                         derivation += (symb,)
 
-            if escaped:
+            if escaped or hex_code is not None:
                 raise ParsingError("Escape symbol must end with something.")
             if nterm_flag:
                 raise ParsingError("Non-terminal symbol must ends with >.")
@@ -0,0 +1,363 @@
+from typing import Dict, List, Tuple, Optional, Union
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import asyncio
+import io
+import json
+import os
+
+import grammar
+from loader import parse_grammar, ParsingError
+
+Prepared = Tuple[grammar.Grammar, grammar.grammar.First]
+
+
+def prepare_text(text: str) -> Prepared:
+    """
+    Parses and prepares the grammar, executed in worker process.
+    :param text: grammar in the loader format.
+    :return: prepared grammar and its FIRST mapping.
+    """
+    g = parse_grammar(io.StringIO(text)).prepare_for_checking(verbose=False)
+    return g, g.build_first()
+
+
+def describe(result: grammar.CheckResult) -> dict:
+    """
+    Returns JSON representation of the result.
+    :param result: CheckResult
+    :return: verdict and the furthest failure, if it is known.
+    """
+    response = {"verdict": result.verdict.value}
+    if result.failure is not None:
+        response["position"] = result.failure.position
+        response["expected"] = list(result.failure.expected)
+        response["found"] = result.failure.found
+    return response
+
+
+def check_one(g: grammar.Grammar, first: grammar.grammar.First, word: str,
+              budget: grammar.Budget = None, diagnose: bool = False) -> Union[bool, str, dict]:
+    """
+    Checks the word, executed in worker process.
+    :param g: prepared grammar.
+    :param first: FIRST mapping of the grammar.
+    :param word: word to check.
+    :param budget: limit of checking, if given.
+    :param diagnose: describe failure if the word is rejected.
+    :return: verdict, see check_batch, or object with "error" if checking failed.
+    """
+    try:
+        if diagnose:
+            return describe(g.check(word, first, budget, diagnose=True))
+        if budget is None:
+            return g.check_word(word, first)
+        return g.check(word, first, budget).verdict.value
+    except Exception as e:
+        # Failure of one word(e.g. too deep recursion)
+        # mustn't lose verdicts of the others.
+        return {"error": "{}: {}".format(type(e).__name__, e)}
+
+
+def check_batch(g: grammar.Grammar, first: grammar.grammar.First, words: List[str],
+                budget: grammar.Budget = None, diagnose: bool = False) -> List[Union[bool, str, dict]]:
+    """
+    Checks the words, executed in worker process.
+    :param g: prepared grammar.
+    :param first: FIRST mapping of the grammar.
+    :param words: words to check.
+    :param budget: limit of checking of every word, if given.
+    :param diagnose: describe failures of rejected words.
+    :return: list of verdicts in order of words, "accept", "reject" or "unknown" if budget is given,
+    objects of describe if diagnose is set, objects with "error" for words checking of which failed.
+    """
+    return [check_one(g, first, word, budget, diagnose) for word in words]
+
+
+# Grammars cached by worker process: identifier -> generation and grammar.
+# Generation changes on every load, so reloaded grammar replaces the old one.
+_cached: Dict[str, Tuple[int, Prepared]] = dict()
+
+
+def check_cached(gid: str, live: Dict[str, int], words: List[str], budget: grammar.Budget = None,
+                 diagnose: bool = False, prepared: Prepared = None) -> Optional[List[Union[bool, str, dict]]]:
+    """
+    Checks the words by the grammar cached in the worker process.
+    :param gid: identifier of the grammar.
+    :param live: generations of all loaded grammars, the other cached ones are dropped.
+    :param words: words to check.
+    :param budget: limit of checking of every word, if given.
+    :param diagnose: describe failures of rejected words.
+    :param prepared: the grammar to cache, sent only if the worker doesn't have it.
+    :return: see check_batch, None if the worker doesn't have the grammar.
+    """
+    # Unloaded and reloaded grammars.
+    for stale in [key for key, (gen, _) in _cached.items() if live.get(key) != gen]:
+        del _cached[stale]
+    generation = live[gid]
+    if prepared is not None:
+        _cached[gid] = (generation, prepared)
+    entry = _cached.get(gid)
+    if entry is None or entry[0] != generation:
+        return None
+    g, first = entry[1]
+    return check_batch(g, first, words, budget, diagnose)
+
+
+class RequestError(Exception):
+    pass
+
+
+async def _skip_line(reader: asyncio.StreamReader):
+    """
+    Discards the rest of the line which is longer than the limit of the stream.
+    :param reader: stream of requests.
+    :return: none.
+    """
+    while True:
+        try:
+            await reader.readuntil(b'\n')
+            return
+        except asyncio.LimitOverrunError as e:
+            await reader.readexactly(e.consumed)
+        except asyncio.IncompleteReadError:
+            return
+
+
+class GrammarServer:
+    """
+    Recognizer service which keeps prepared grammars in memory.
+
+    Protocol is line based: every request is one JSON object
+    on the separate line, every response is one JSON object too.
+
+    {"op": "load", "id": ID, "path": PATH} or {"op": "load", "id": ID, "text": GRAMMAR}
+    {"op": "check", "id": ID, "words": [WORD, ...]}
+    {"op": "check", "id": ID, "words": [WORD, ...], "budget": {"steps": N, "seconds": T}}
+    {"op": "check", "id": ID, "words": [WORD, ...], "diagnose": true}
+    {"op": "unload", "id": ID}
+    {"op": "list"}
+
+    Response has "ok" field, and "error" field if the request failed.
+    The "tag" field of the request is returned back as is. Loading by path
+    is allowed only from the grammar directory, if it is given. Result of
+    a word checking of which failed is {"error": MESSAGE}.
+
+    Every worker process caches grammars it has checked by, so
+    requests send only the identifier and the words, the grammar
+    is sent to the worker once, when it is used there at first.
+    """
+
+    def __init__(self, workers: int = None, max_concurrency: int = 8, max_request: int = 64 << 20,
+                 grammar_dir: str = None):
+        """
+        Constructs the server.
+        :param workers: size of process pool, by default amount of CPUs.
+        :param max_concurrency: maximal amount of simultaneously executed jobs.
+        :param max_request: maximal length of request line in bytes.
+        :param grammar_dir: directory grammars can be loaded from by path,
+        loading by path is disabled if it isn't given.
+        """
+        self.grammars: Dict[str, Prepared] = dict()
+        self.generations: Dict[str, int] = dict()
+        self._next_generation = 0
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.max_concurrency = max_concurrency
+        self.max_request = max_request
+        self.grammar_dir = None if grammar_dir is None else os.path.realpath(grammar_dir)
+        self._limit: Optional[asyncio.Semaphore] = None
+
+    async def _run(self, func, *args):
+        """
+        Executes the function in the process pool respecting concurrency limit.
+        :param func: picklable function.
+        :param args: its arguments.
+        :return: result of the function.
+        """
+        if self._limit is None:
+            self._limit = asyncio.Semaphore(self.max_concurrency)
+        async with self._limit:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.pool, func, *args)
+
+    async def load(self, gid: str, text: str) -> grammar.Grammar:
+        """
+        Prepares the grammar and registers it under the identifier.
+        :param gid: identifier of the grammar.
+        :param text: grammar in the loader format.
+        :return: prepared grammar.
+        """
+        try:
+            g, first = await self._run(prepare_text, text)
+        except ParsingError as e:
+            raise RequestError("Grammar parsing error: {}".format(e))
+        self.grammars[gid] = (g, first)
+        self.generations[gid] = self._next_generation
+        self._next_generation += 1
+        return g
+
+    async def check(self, gid: str, words: List[str], budget: grammar.Budget = None,
+                    diagnose: bool = False) -> List[Union[bool, str, dict]]:
+        """
+        Checks the batch of words by the registered grammar.
+        :param gid: identifier of the grammar.
+        :param words: words to check.
+        :param budget: limit of checking of every word, if given.
+        :param diagnose: describe failures of rejected words.
+        :return: list of verdicts in order of words.
+        """
+        if gid not in self.grammars:
+            raise RequestError("Unknown grammar {}.".format(gid))
+        live = dict(self.generations)
+        results = await self._run(check_cached, gid, live, words, budget, diagnose)
+        if results is None:
+            results = await self._run(check_cached, gid, live, words, budget, diagnose, self.grammars[gid])
+        return results
+
+    def grammar_path(self, path: str) -> str:
+        """
+        Resolves path of the grammar requested by client.
+        :param path: requested path, relative to the grammar directory.
+        :return: resolved path.
+        :raises: RequestError if loading by path is disabled or the path is outside the grammar directory.
+        """
+        if self.grammar_dir is None:
+            raise RequestError("Loading by path is disabled.")
+        resolved = os.path.realpath(os.path.join(self.grammar_dir, path))
+        if os.path.commonpath([resolved, self.grammar_dir]) != self.grammar_dir:
+            raise RequestError("Path {} is outside the grammar directory.".format(path))
+        return resolved
+
+    async def handle(self, request: dict) -> dict:
+        """
+        Executes one request.
+        :param request: decoded request.
+        :return: response.
+        """
+        op = request.get("op")
+        if op == "load":
+            if "text" in request:
+                text = request["text"]
+            elif "path" in request:
+                with open(self.grammar_path(request["path"])) as file:
+                    text = file.read()
+            else:
+                raise RequestError("Load requires text or path.")
+            g = await self.load(request["id"], text)
+            return {"ok": True, "id": request["id"], "rules": g.rules_count()}
+        elif op == "check":
+            budget = None
+            if "budget" in request:
+                limits = request["budget"]
+                if not isinstance(limits, dict):
+                    raise RequestError("Budget must be an object.")
+                budget = grammar.Budget(limits.get("steps"), limits.get("seconds"))
+            words = request["words"]
+            if not isinstance(words, list) or not all(isinstance(word, str) for word in words):
+                raise RequestError("Words must be a list of strings.")
+            results = await self.check(request["id"], words, budget, bool(request.get("diagnose")))
+            return {"ok": True, "id": request["id"], "results": results}
+        elif op == "unload":
+            self.grammars.pop(request["id"], None)
+            self.generations.pop(request["id"], None)
+            return {"ok": True, "id": request["id"]}
+        elif op == "list":
+            return {"ok": True, "ids": sorted(self.grammars.keys())}
+        raise RequestError("Unknown operation {}.".format(op))
+
+    async def serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Handles requests of one connection until it is closed.
+        :param reader: stream of requests.
+        :param writer: stream of responses.
+        :return: none.
+        """
+        try:
+            while True:
+                try:
+                    line = await reader.readuntil(b'\n')
+                except asyncio.IncompleteReadError as e:
+                    # The last request can be without newline.
+                    line = e.partial
+                    if not line:
+                        break
+                except asyncio.LimitOverrunError:
+                    await _skip_line(reader)
+                    line = None
+                if line is not None and not line.strip():
+                    continue
+                tag = None
+                try:
+                    if line is None:
+                        raise RequestError("Request is longer than {} bytes.".format(self.max_request))
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise RequestError("Request must be an object.")
+                    tag = request.get("tag")
+                    response = await self.handle(request)
+                except Exception as e:
+                    # Failure of one request(including errors of
+                    # workers, e.g. too deep recursion on long
+                    # words) mustn't drop the connection.
+                    response = {"ok": False, "error": "{}: {}".format(type(e).__name__, e)}
+                if tag is not None:
+                    response["tag"] = tag
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, unix_path: str = None, host: str = '127.0.0.1', port: int = 8765):
+        """
+        Listens Unix socket if path is given, else localhost TCP port.
+        :param unix_path: path of Unix socket.
+        :param host: TCP host.
+        :param port: TCP port.
+        :return: none, serves forever.
+        """
+        if unix_path is not None:
+            server = await asyncio.start_unix_server(self.serve_client, path=unix_path, limit=self.max_request)
+        else:
+            server = await asyncio.start_server(self.serve_client, host=host, port=port, limit=self.max_request)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        """
+        Stops worker processes.
+        :return: none.
+        """
+        self.pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recognizer service holding prepared grammars.")
+    parser.add_argument("--unix", help="path of Unix socket to listen")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None, help="size of process pool")
+    parser.add_argument("--max-concurrency", type=int, default=8, help="simultaneously executed jobs")
+    parser.add_argument("--max-request", type=int, default=64 << 20, help="maximal length of request line in bytes")
+    parser.add_argument("--grammar-dir", default=None, help="directory clients can load grammars from by path")
+    parser.add_argument("--load", nargs=2, action="append", default=[], metavar=("ID", "PATH"),
+                        help="grammar to load at startup")
+    args = parser.parse_args()
+
+    server = GrammarServer(args.workers, args.max_concurrency, args.max_request, args.grammar_dir)
+
+    async def run():
+        for gid, path in args.load:
+            with open(path) as file:
+                await server.load(gid, file.read())
+        await server.serve(args.unix, args.host, args.port)
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == '__main__':
+    main()
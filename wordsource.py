@@ -0,0 +1,143 @@
+from typing import IO, Iterator, Iterable, Optional, Tuple, Union
+import io
+import mmap
+
+import grammar
+
+TRUE_MARKER = b'[true]'
+FALSE_MARKER = b'[false]'
+# Verdicts of words checking of which exceeded the budget.
+UNKNOWN_MARKER = b'[unknown]'
+
+
+class WordFileError(Exception):
+    pass
+
+
+def scan_lines(path: str) -> Iterator[memoryview]:
+    """
+    Iterates through lines of the file without reading it into memory.
+
+    The file is memory-mapped and every line is a view of the mapping
+    without newline symbol, so it is valid only until the next line
+    is requested. Slices of the view stay valid, they keep the mapping
+    open until they are freed.
+
+    :param path: path of the file.
+    :return: iterator of memoryview.
+    """
+    with open(path, 'rb') as file:
+        try:
+            mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file can't be mapped.
+            return
+    view = memoryview(mm)
+    try:
+        size = len(mm)
+        pos = 0
+        while pos < size:
+            end = mm.find(b'\n', pos)
+            if end == -1:
+                end = size
+            line = view[pos:end]
+            try:
+                yield line
+            finally:
+                line.release()
+            pos = end + 1
+    finally:
+        view.release()
+        try:
+            mm.close()
+        except BufferError:
+            # Caller keeps slices of the lines, they hold
+            # the mapping, it is closed when they are freed.
+            pass
+
+
+def scan_words(path: str, binary: bool = False) -> Iterator[Tuple[bool, Union[str, memoryview]]]:
+    """
+    Iterates through words of the test file with their truth expectation.
+
+    Handles [true] and [false] control sequences, words
+after [unknown] one(written by write_verdicts) are skipped.
+
+    :param path: path of the test file.
+    :param binary: yield views of the file instead of decoded strings,
+    such views are valid only until the next word is requested.
+    :return: iterator of (expectation, word).
+    :raises: WordFileError if the file doesn't begin with control sequence.
+    """
+    mode: bool = None
+    unknown = False
+    for line in scan_lines(path):
+        if line == TRUE_MARKER:
+            mode, unknown = True, False
+            continue
+        elif line == FALSE_MARKER:
+            mode, unknown = False, False
+            continue
+        elif line == UNKNOWN_MARKER:
+            unknown = True
+            continue
+        if unknown:
+            continue
+        if mode is None:
+            raise WordFileError("Test file must have verity declaration at its beginning")
+        yield mode, line if binary else str(line, 'utf-8')
+
+
+def check_words(g: grammar.Grammar, first: Union[grammar.grammar.First, grammar.ByteTables],
+                words: Iterable[Tuple[bool, Union[str, memoryview]]],
+                budget: grammar.Budget = None) -> Iterator[Tuple[bool, str, Optional[bool]]]:
+    """
+    Checks the words as they come.
+    :param g: prepared grammar.
+    :param first: FIRST mapping of the grammar, or its ByteTables for binary words.
+    :param words: pairs of expectation and word.
+    :param budget: limit of checking of every word, it is restarted for every word.
+    :return: iterator of (expectation, word, verdict), verdict is None
+    if the budget was exceeded.
+    """
+    if budget is None:
+        for expected, word in words:
+            yield expected, word, g.check_word(word, first)
+        return
+    for expected, word in words:
+        verdict = g.check(word, first, budget).verdict
+        yield expected, word, None if verdict == grammar.Verdict.UNKNOWN else verdict == grammar.Verdict.ACCEPT
+
+
+def write_verdicts(results: Iterable[Tuple[bool, Union[str, memoryview], Optional[bool]]],
+                   out: IO) -> Iterator[Tuple[bool, Union[str, memoryview], Optional[bool]]]:
+    """
+    Writes verdicts into the file in the test file format as they are produced.
+
+    Results are passed through, so the function can be chained.
+    Binary words(views of scan_words) are written before they are
+    passed through, because they are valid only until the next word.
+    Words without verdict(None) are written after [unknown] marker.
+
+    :param results: triples of expectation, word and verdict.
+    :param out: file for verdicts, binary words are written as is
+    into binary file and decoded as UTF-8 for text one(invalid
+    bytes are replaced).
+    :return: iterator of the same triples.
+    """
+    binary = not isinstance(out, io.TextIOBase)
+    mode: Optional[bool] = None
+    started = False
+    for expected, word, verdict in results:
+        if verdict != mode or not started:
+            mode, started = verdict, True
+            marker = UNKNOWN_MARKER if verdict is None else TRUE_MARKER if verdict else FALSE_MARKER
+            out.write(marker + b'\n' if binary else str(marker, 'ascii') + '\n')
+        if isinstance(word, str):
+            out.write(word.encode('utf-8') + b'\n' if binary else word + '\n')
+        elif binary:
+            out.write(word)
+            out.write(b'\n')
+        else:
+            out.write(str(word, 'utf-8', 'replace') + '\n')
+        yield expected, word, verdict